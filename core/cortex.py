@@ -94,6 +94,9 @@ class Cortex(Dispatcher):
         self.debit = 10
         self.license = ''
         self.isHeadsetConnected = False
+        # Decoder for incoming frames; any callable taking the frame text or
+        # bytes and returning dicts works, e.g. orjson.loads
+        self.loads = json.loads
 
         if client_id == '':
             raise ValueError('Empty your_app_client_id. Please fill in your_app_client_id before running the example.')
@@ -113,6 +116,8 @@ class Cortex(Dispatcher):
                 self.debit = value
             elif  key == 'headset_id':
                 self.headset_id = value
+            elif key == 'loads':
+                self.loads = value
 
     def open(self):
         url = "wss://localhost:6868"
@@ -416,7 +421,7 @@ class Cortex(Dispatcher):
             print(result_dic)
 
     def on_message(self, *args):
-        recv_dic = json.loads(args[1])
+        recv_dic = self.loads(args[1])
         if 'sid' in recv_dic:
             self.handle_stream_data(recv_dic)
         elif 'result' in recv_dic:
@@ -1,8 +1,130 @@
 import os
+import io
 import time
 import csv
+import ctypes
+import logging
+import threading
+from collections import deque
 from datetime import datetime
+from enum import IntEnum
+import numpy as np
 from core.cortex import Cortex
+from core.ring_buffer import RingBuffer, RowPool
+from core.sample_streamer import LslSampleStreamer, TcpSampleStreamer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+try:
+    import orjson
+except ImportError:  # Cortex falls back to the stdlib json decoder
+    orjson = None
+
+# Nominal Cortex sample rates (Hz) of the numeric streams, used to size the
+# per-stream ring buffers
+NUMERIC_STREAM_RATES = {'eeg': 256, 'mot': 64, 'dev': 2, 'met': 2, 'pow': 8}
+# Seconds of samples a ring holds before the producer starts dropping rows
+RING_SECONDS = 8
+# Extra rows allocated on top of RING_SECONDS * rate to absorb rate jitter
+BUFFER_HEADROOM = 1024
+# Seconds between two flushes of the ring buffers to disk
+FLUSH_INTERVAL = 1.0
+# Flush interval while streaming live, so 256 Hz EEG leaves in ~16-sample packets
+STREAM_FLUSH_INTERVAL = 1 / 16
+# Seconds between two progress log lines
+REPORT_INTERVAL = 2.0
+STREAM_ORDER = ['eeg', 'mot', 'dev', 'met', 'pow', 'fac', 'com', 'sys']
+
+
+class Stream(IntEnum):
+    """Index of each stream in STREAM_ORDER, used by the per-sample path."""
+    EEG = 0
+    MOT = 1
+    DEV = 2
+    MET = 3
+    POW = 4
+    FAC = 5
+    COM = 6
+    SYS = 7
+
+
+EVENT_STREAMS = (Stream.FAC, Stream.COM, Stream.SYS)
+# Leading columns of each row ahead of the Cortex data labels; device rows
+# carry signal and battery before the contact-quality values
+HEADER_PREFIX = {'dev': ['timestamp', 'signal', 'batteryPercent']}
+# Cortex sends no data labels for facial expressions and mental commands
+FIXED_HEADERS = {
+    'fac': ['timestamp', 'eyeAct', 'uAct', 'uPow', 'lAct', 'lPow'],
+    'com': ['timestamp', 'action', 'power'],
+}
+
+# Windows SetThreadPriority level used for realtime_priority
+THREAD_PRIORITY_TIME_CRITICAL = 15
+
+logger = logging.getLogger(__name__)
+
+
+def _pin_current_thread(cpus=None, realtime_priority=None):
+    """Pin the calling thread to cpus and optionally give it a realtime priority."""
+    # Both calls are best effort: a missing CPU or privilege only costs jitter
+    if cpus:
+        if hasattr(os, 'sched_setaffinity'):
+            try:
+                # On Linux pid 0 targets the calling thread, not the process
+                os.sched_setaffinity(0, cpus)
+            except OSError as e:
+                logger.warning("Could not pin %s to CPUs %s: %s", threading.current_thread().name, sorted(cpus), e)
+        elif os.name == 'nt':
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), sum(1 << cpu for cpu in cpus)):
+                logger.warning("Could not pin %s to CPUs %s", threading.current_thread().name, sorted(cpus))
+    if realtime_priority:
+        if hasattr(os, 'sched_setscheduler'):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(realtime_priority))
+            except OSError as e:
+                logger.warning("Could not switch %s to SCHED_FIFO: %s", threading.current_thread().name, e)
+        elif os.name == 'nt':
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL):
+                logger.warning("Could not raise the priority of %s", threading.current_thread().name)
+
+
+def _write_chunks(fd, chunks):
+    """Write all chunks to fd, gathering them into one syscall where the OS allows."""
+    if hasattr(os, 'writev'):
+        for start in range(0, len(chunks), 512):  # stay below IOV_MAX
+            batch = chunks[start:start + 512]
+            written = os.writev(fd, batch)
+            # A short write leaves a tail of the batch; only that part is copied
+            for i, chunk in enumerate(batch):
+                if written < len(chunk):
+                    _write_all(fd, b''.join([chunk[written:]] + batch[i + 1:]))
+                    break
+                written -= len(chunk)
+    else:
+        _write_all(fd, b''.join(chunks))
+
+
+def _write_all(fd, data):
+    """Write data to fd, retrying after short writes."""
+    data = memoryview(data)
+    while data:
+        data = data[os.write(fd, data):]
+
+
+# Sample values are stored as float32, which is finer than the headset's
+# physical resolution and halves the bytes moved per sample
+VALUE_DTYPE = np.float32
+# CSV number formats: Cortex timestamps carry sub-millisecond precision on top
+# of the epoch seconds, float32 sample values hold about 7 significant digits
+TIMESTAMP_FMT = '%.6f'
+VALUE_FMT = '%.7g'
+
 
 class DataCollector:
     """
@@ -23,29 +145,79 @@ class DataCollector:
         print("Initializing Emotiv Data Collector")
         print("=" * 60)
         
-        # Initialize data storage
-        self.data_buffer = {
-            'eeg': [],
-            'mot': [],
-            'dev': [],
-            'met': [],
-            'pow': [],
-            'fac': [],
-            'com': [],
-            'sys': []
-        }
+        # Initialize data storage. The Cortex thread pushes numeric samples
+        # into per-stream ring buffers and string-valued rows into deques;
+        # the flusher thread drains both every FLUSH_INTERVAL seconds and
+        # appends them to the stream files, or keeps the drained blocks in
+        # data_buffer when not saving to file.
+        self.data_buffer = {stream_name: [] for stream_name in STREAM_ORDER}
+        self._rings = {}
+        # Jump table for the numeric streams, indexed by Stream: [ring, layout],
+        # where layout maps a Cortex event payload to (timestamp, values) and
+        # the ring is created on the stream's first sample
+        self._dispatch = [
+            [None, lambda d: (d['time'], d['eeg'])],
+            [None, lambda d: (d['time'], d['mot'])],
+            [None, lambda d: (d['time'], [d['signal'], d['batteryPercent']] + d['dev'])],
+            [None, lambda d: (d['time'], d['met'])],
+            [None, lambda d: (d['time'], d['pow'])],
+        ]
+        self._queues = [None] * len(Stream)
+        self._event_streams = list(EVENT_STREAMS)
+        for stream in EVENT_STREAMS:
+            self._queues[stream] = deque()
+        # Fixed-width string rows are recycled once written to file
+        self._row_pools = [None] * len(Stream)
+        self._row_pools[Stream.FAC] = RowPool(6)
+        self._row_pools[Stream.COM] = RowPool(3)
+        self._sample_counts = {stream_name: 0 for stream_name in STREAM_ORDER}
+        # Stream file descriptors (CSV) or Parquet writers, plus the encoded
+        # CSV chunks waiting for the next gather write
+        self._fds = {}
+        self._pending = {}
+        self._files = {}
+        self._file_names = {}
+        self._file_timestamp = None
+        self._flush_interval = FLUSH_INTERVAL
+        # Latest device status and mental command, reported by the flusher
+        # thread instead of printed from the Cortex callbacks
+        self._last_dev = None
+        self._last_command = None
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        self._deadline = None
         
         self.data_labels = {}
+        # Column headers and the CSV header line per stream, built once when
+        # the stream's labels arrive
+        self._headers = dict(FIXED_HEADERS)
+        self._header_lines = {stream_name: ','.join(headers) + '\n' for stream_name, headers in FIXED_HEADERS.items()}
+        # Streams whose unlabelled samples were already reported
+        self._unlabelled = set()
         self.collection_start_time = None
         self.collection_duration = 30  # Default 30 seconds
         self.save_to_file = True
+        self.output_format = "csv"  # or "parquet" for the numeric streams (requires pyarrow)
         self.output_directory = "collected_data"
+        # Live sink for the numeric streams: (host, port) of a TCP recorder,
+        # or "lsl" to publish Lab Streaming Layer outlets (requires pylsl)
+        self.stream_to = None
+        self._streamer = None
+        # Optional scheduling of the Cortex thread, which runs the sample
+        # callbacks, and of the flusher thread: CPU sets such as {1} and {2},
+        # and a SCHED_FIFO priority for the Cortex thread (needs root or
+        # CAP_SYS_NICE; time-critical thread priority on Windows)
+        self.acquisition_cpus = None
+        self.flusher_cpus = None
+        self.realtime_priority = None
         
         # Create output directory if it doesn't exist
         if self.save_to_file and not os.path.exists(self.output_directory):
             os.makedirs(self.output_directory)
         
-        # Initialize Cortex connection
+        # Initialize Cortex connection, decoding frames with orjson when available
+        if orjson is not None:
+            kwargs.setdefault('loads', orjson.loads)
         self.c = Cortex(app_client_id, app_client_secret, debug_mode=True, **kwargs)
         
         # Bind event handlers
@@ -55,20 +227,36 @@ class DataCollector:
         self.c.bind(create_session_done=self.on_create_session_done)
         self.c.bind(inform_error=self.on_inform_error)
         self.c.bind(new_data_labels=self.on_new_data_labels)
-        self.c.bind(new_eeg_data=self.on_new_eeg_data)
-        self.c.bind(new_mot_data=self.on_new_mot_data)
-        self.c.bind(new_dev_data=self.on_new_dev_data)
-        self.c.bind(new_met_data=self.on_new_met_data)
-        self.c.bind(new_pow_data=self.on_new_pow_data)
-        self.c.bind(new_fe_data=self.on_new_fe_data)
-        self.c.bind(new_com_data=self.on_new_com_data)
-        self.c.bind(new_sys_data=self.on_new_sys_data)
+        # Data handlers are bound per collection, for the subscribed streams only
+        self._stream_handlers = {
+            'eeg': ('new_eeg_data', self.on_new_eeg_data),
+            'mot': ('new_mot_data', self.on_new_mot_data),
+            'dev': ('new_dev_data', self.on_new_dev_data),
+            'met': ('new_met_data', self.on_new_met_data),
+            'pow': ('new_pow_data', self.on_new_pow_data),
+            'fac': ('new_fe_data', self.on_new_fe_data),
+            'com': ('new_com_data', self.on_new_com_data),
+            'sys': ('new_sys_data', self.on_new_sys_data),
+        }
+        
+    def _bind_stream_handlers(self, streams):
+        for stream_name, (event, handler) in self._stream_handlers.items():
+            self.c.unbind(handler)
+            if stream_name in streams:
+                self.c.bind(**{event: handler})
         
     def start_collection(self, streams=None, duration=30, headset_id=''):
         if streams is None:
             streams = ['eeg', 'mot', 'dev', 'met', 'pow', 'fac', 'com', 'sys']
         self.streams = streams
         self.collection_duration = duration
+        # Back to the slow flush cadence until a live streamer is opened
+        self._flush_interval = FLUSH_INTERVAL
+        # Buffers, counters and handlers exist only for the subscribed streams
+        self._reset_buffers(streams)
+        self._bind_stream_handlers(streams)
+        if self.save_to_file and self.output_format == 'parquet' and pq is None:
+            raise ImportError("Parquet output requires pyarrow. Please run: pip install pyarrow")
         print("\nStarting data collection:")
         print(f"  - Streams: {', '.join(streams)}")
         print(f"  - Duration: {duration} seconds")
@@ -80,44 +268,228 @@ class DataCollector:
         
     def subscribe_streams(self):
         print(f"\nSubscribing to data streams: {', '.join(self.streams)}")
+        # Called back on the Cortex thread, which delivers every sample
+        _pin_current_thread(self.acquisition_cpus, self.realtime_priority)
         self.c.sub_request(self.streams)
         self.collection_start_time = time.time()
+        self._file_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         print(f"Data collection started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        import threading
-        stop_timer = threading.Timer(self.collection_duration, self.stop_collection)
-        stop_timer.start()
+        # The flusher thread stops the collection once the deadline passes
+        self._deadline = time.monotonic() + self.collection_duration
+        if self.stream_to is not None:
+            self._open_streamer()
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name='DataCollectorFlusher', daemon=True)
+        self._flusher.start()
         
     def stop_collection(self):
         print(f"\nStopping data collection after {self.collection_duration} seconds...")
         self.c.unsub_request(self.streams)
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
         if self.save_to_file:
             self.save_data_to_files()
+        else:
+            self._drain_buffers()
+        self._close_streamer()
         self.print_collection_summary()
+        # Samples still in flight after unsubscribing must not reach the next collection
+        self._reset_rings()
         self.c.close()
         
+    def _reset_buffers(self, streams):
+        self.data_buffer = {stream_name: [] for stream_name in streams}
+        self._sample_counts = {stream_name: 0 for stream_name in streams}
+        self._event_streams = [stream for stream in EVENT_STREAMS if STREAM_ORDER[stream] in streams]
+        self._reset_rings()
+
+    def _reset_rings(self):
+        # Rings are recreated on each stream's first sample, sized for its labels
+        self._rings = {}
+        for entry in self._dispatch:
+            entry[0] = None
+        for stream in EVENT_STREAMS:
+            self._queues[stream].clear()
+        self._unlabelled = set()
+
+    def _open_streamer(self):
+        if self.stream_to == 'lsl':
+            self._streamer = LslSampleStreamer()
+        else:
+            host, port = self.stream_to
+            self._streamer = TcpSampleStreamer(host, port)
+        self._flush_interval = STREAM_FLUSH_INTERVAL
+        print(f"  - Streaming numeric samples to: {self.stream_to}")
+
+    def _stream_block(self, stream_name, values, times):
+        try:
+            self._streamer.send_block(stream_name, times, values, self._headers[stream_name])
+        except OSError as e:
+            print(f"❌ Live streaming stopped: {e}")
+            self._close_streamer()
+
+    def _close_streamer(self):
+        if self._streamer is not None:
+            self._streamer.close()
+            self._streamer = None
+        self._flush_interval = FLUSH_INTERVAL
+
+    def _has_headers(self, stream_name):
+        # Cortex answers the subscribe request, labels included, before it
+        # sends any data on the same socket, so missing labels mean a broken
+        # stream. Its samples are dropped where they come in, on the Cortex
+        # thread, so that nothing unlabelled reaches the flusher
+        if stream_name in self._headers:
+            return True
+        if stream_name not in self._unlabelled:
+            self._unlabelled.add(stream_name)
+            logger.warning("Dropping %s samples received before its data labels", stream_name)
+        return False
+
+    def _create_ring(self, stream_name, n_values):
+        capacity = NUMERIC_STREAM_RATES[stream_name] * RING_SECONDS + BUFFER_HEADROOM
+        ring = self._rings[stream_name] = RingBuffer(capacity, n_values, VALUE_DTYPE)
+        return ring
+
+    def _ingest(self, stream, data):
+        entry = self._dispatch[stream]
+        timestamp, values = entry[1](data)
+        ring = entry[0]
+        if ring is None:
+            stream_name = STREAM_ORDER[stream]
+            if not self._has_headers(stream_name):
+                return
+            ring = entry[0] = self._create_ring(stream_name, len(values))
+        ring.push(timestamp, values)
+
+    def _flush_loop(self):
+        _pin_current_thread(self.flusher_cpus)
+        next_report = time.monotonic() + REPORT_INTERVAL
+        while True:
+            timeout = min(self._flush_interval, self._deadline - time.monotonic())
+            if self._stop_flusher.wait(max(timeout, 0)):
+                return
+            now = time.monotonic()
+            if now >= self._deadline:
+                self.stop_collection()
+                return
+            self._drain_buffers()
+            if now >= next_report:
+                self._report_progress()
+                next_report += REPORT_INTERVAL
+
+    def _report_progress(self):
+        parts = [f"{stream_name.upper()}: {count}" for stream_name, count in self._sample_counts.items() if count]
+        if self._last_dev is not None:
+            battery, signal = self._last_dev
+            parts.append(f"Battery {battery}%, Signal Quality {signal:.1f}")
+        if self._last_command is not None:
+            action, power = self._last_command
+            parts.append(f"Mental Command: {action} (power: {power:.2f})")
+        logger.info("Collected samples - %s", ' | '.join(parts) if parts else 'none yet')
+
+    def _drain_buffers(self):
+        """Move everything the Cortex thread produced to disk (or memory)."""
+        for stream_name, ring in list(self._rings.items()):
+            if len(ring):
+                times, values = ring.drain()
+                self._store_block(stream_name, values, times)
+        for stream in self._event_streams:
+            queue = self._queues[stream]
+            stream_name = STREAM_ORDER[stream]
+            if queue:
+                self._store_block(stream_name, [queue.popleft() for _ in range(len(queue))])
+        self._flush_pending()
+
+    def _store_block(self, stream_name, rows, times=None):
+        """Persist one drained block; numeric blocks come with their timestamps."""
+        self._sample_counts[stream_name] += len(rows)
+        if times is not None and self._streamer is not None:
+            self._stream_block(stream_name, rows, times)
+        if self.save_to_file:
+            self._write_rows(stream_name, rows, times)
+            pool = self._row_pools[Stream[stream_name.upper()]]
+            if pool is not None:
+                pool.release(rows)
+        else:
+            self.data_buffer[stream_name].append((times, rows))
+
+    def _stream_filename(self, stream_name, extension):
+        if self._file_timestamp is None:
+            self._file_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{self.output_directory}/data_{stream_name}_{self._file_timestamp}.{extension}"
+        self._file_names[stream_name] = filename
+        return filename
+
+    def _open_stream_file(self, stream_name):
+        header_line = self._header_lines[stream_name]
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+        self._fds[stream_name] = os.open(self._stream_filename(stream_name, 'csv'), flags, 0o644)
+        # The header goes out together with the first block
+        self._pending[stream_name] = [header_line.encode('utf-8')]
+
+    def _open_parquet_writer(self, stream_name, values):
+        headers = self._headers[stream_name]
+        value_type = pa.from_numpy_dtype(values.dtype)
+        schema = pa.schema([(headers[0], pa.float64())] + [(name, value_type) for name in headers[1:]])
+        writer = pq.ParquetWriter(self._stream_filename(stream_name, 'parquet'), schema,
+                                  compression='zstd', compression_level=1)
+        self._files[stream_name] = writer
+        return writer
+
+    def _write_rows(self, stream_name, rows, times=None):
+        if times is not None and self.output_format == 'parquet':
+            # Columns go to Arrow straight from the NumPy buffers, one row
+            # group per drained block
+            writer = self._files.get(stream_name) or self._open_parquet_writer(stream_name, rows)
+            columns = [pa.array(times)] + [pa.array(rows[:, i]) for i in range(rows.shape[1])]
+            writer.write_table(pa.Table.from_arrays(columns, schema=writer.schema))
+            return
+        if stream_name not in self._fds:
+            self._open_stream_file(stream_name)
+        if times is not None:
+            # One vectorized encode per block: formatting runs in C
+            chunk = io.BytesIO()
+            fmt = [TIMESTAMP_FMT] + [VALUE_FMT] * rows.shape[1]
+            np.savetxt(chunk, np.column_stack((times, rows)), fmt=fmt, delimiter=',')
+            self._pending[stream_name].append(chunk.getvalue())
+        else:
+            chunk = io.StringIO()
+            csv.writer(chunk, lineterminator='\n').writerows(rows)
+            self._pending[stream_name].append(chunk.getvalue().encode('utf-8'))
+
+    def _flush_pending(self):
+        """Hand the encoded CSV chunks to the OS, one gather write per stream file."""
+        for stream_name, chunks in self._pending.items():
+            if chunks:
+                _write_chunks(self._fds[stream_name], chunks)
+                chunks.clear()
+
     def save_data_to_files(self):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        for stream_name, data_list in self.data_buffer.items():
-            if data_list:
-                filename = f"{self.output_directory}/data_{stream_name}_{timestamp}.csv"
-                with open(filename, 'w', newline='') as csvfile:
-                    if stream_name in self.data_labels:
-                        headers = ['timestamp'] + self.data_labels[stream_name]
-                    else:
-                        headers = ['timestamp'] + [f'value_{i}' for i in range(len(data_list[0]) - 1)]
-                    writer = csv.writer(csvfile)
-                    writer.writerow(headers)
-                    for data_point in data_list:
-                        writer.writerow(data_point)
-                print(f"  - Saved {len(data_list)} {stream_name} samples to {filename}")
+        """Write out everything not yet on disk and close the stream files."""
+        self._drain_buffers()
+        for stream_name, blocks in self.data_buffer.items():
+            for times, rows in blocks:
+                self._write_rows(stream_name, rows, times)
+            self._flush_pending()
+        for stream_name, fd in self._fds.items():
+            os.close(fd)
+        for stream_name, writer in self._files.items():
+            writer.close()
+        for stream_name, filename in self._file_names.items():
+            print(f"  - Saved {self._sample_counts[stream_name]} {stream_name} samples to {filename}")
+        self._fds = {}
+        self._pending = {}
+        self._files = {}
+        self._file_names = {}
         
     def print_collection_summary(self):
         print("\n" + "=" * 60)
         print("DATA COLLECTION SUMMARY")
         print("=" * 60)
         total_samples = 0
-        for stream_name, data_list in self.data_buffer.items():
-            count = len(data_list)
+        for stream_name, count in self._sample_counts.items():
             if count > 0:
                 total_samples += count
                 print(f"  {stream_name.upper():>4}: {count:>6} samples")
@@ -126,6 +498,9 @@ class DataCollector:
         if total_samples > 0:
             avg_rate = total_samples / self.collection_duration
             print(f"  Average sample rate: {avg_rate:.1f} samples/second")
+        for stream_name, ring in self._rings.items():
+            if ring.dropped:
+                print(f"  ⚠️ {stream_name.upper()}: {ring.dropped} samples dropped (ring buffer full)")
         
     def on_create_session_done(self, *args, **kwargs):
         print("✓ Session created successfully")
@@ -136,75 +511,59 @@ class DataCollector:
         stream_name = data['streamName']
         labels = data['labels']
         self.data_labels[stream_name] = labels
+        headers = self._headers[stream_name] = HEADER_PREFIX.get(stream_name, ['timestamp']) + labels
+        self._header_lines[stream_name] = ','.join(headers) + '\n'
         print(f"✓ Received {stream_name} labels: {len(labels)} channels")
         
     def on_new_eeg_data(self, *args, **kwargs):
-        data = kwargs.get('data')
-        timestamp = data['time']
-        eeg_values = data['eeg']
-        row = [timestamp] + eeg_values
-        self.data_buffer['eeg'].append(row)
-        if len(self.data_buffer['eeg']) % 32 == 0:
-            print(f"EEG: {len(self.data_buffer['eeg'])} samples collected")
+        self._ingest(Stream.EEG, kwargs['data'])
         
     def on_new_mot_data(self, *args, **kwargs):
-        data = kwargs.get('data')
-        timestamp = data['time']
-        mot_values = data['mot']
-        row = [timestamp] + mot_values
-        self.data_buffer['mot'].append(row)
+        self._ingest(Stream.MOT, kwargs['data'])
         
     def on_new_dev_data(self, *args, **kwargs):
-        data = kwargs.get('data')
-        timestamp = data['time']
-        signal = data['signal']
-        dev_values = data['dev']
-        battery = data['batteryPercent']
-        row = [timestamp, signal, battery] + dev_values
-        self.data_buffer['dev'].append(row)
-        if len(self.data_buffer['dev']) % 10 == 0:
-            print(f"Device: Battery {battery}%, Signal Quality {signal:.1f}")
+        data = kwargs['data']
+        self._ingest(Stream.DEV, data)
+        self._last_dev = (data['batteryPercent'], data['signal'])
         
     def on_new_met_data(self, *args, **kwargs):
-        data = kwargs.get('data')
-        timestamp = data['time']
-        met_values = data['met']
-        row = [timestamp] + met_values
-        self.data_buffer['met'].append(row)
+        self._ingest(Stream.MET, kwargs['data'])
         
     def on_new_pow_data(self, *args, **kwargs):
-        data = kwargs.get('data')
-        timestamp = data['time']
-        pow_values = data['pow']
-        row = [timestamp] + pow_values
-        self.data_buffer['pow'].append(row)
+        self._ingest(Stream.POW, kwargs['data'])
         
     def on_new_fe_data(self, *args, **kwargs):
         data = kwargs.get('data')
         timestamp = data['time']
-        eye_act = data['eyeAct']
-        u_act = data['uAct']
-        u_pow = data['uPow']
-        l_act = data['lAct']
-        l_pow = data['lPow']
-        row = [timestamp, eye_act, u_act, u_pow, l_act, l_pow]
-        self.data_buffer['fac'].append(row)
+        row = self._row_pools[Stream.FAC].acquire()
+        row[0] = timestamp
+        row[1] = data['eyeAct']
+        row[2] = data['uAct']
+        row[3] = data['uPow']
+        row[4] = data['lAct']
+        row[5] = data['lPow']
+        self._queues[Stream.FAC].append(row)
         
     def on_new_com_data(self, *args, **kwargs):
         data = kwargs.get('data')
         timestamp = data['time']
         action = data['action']
         power = data['power']
-        row = [timestamp, action, power]
-        self.data_buffer['com'].append(row)
+        row = self._row_pools[Stream.COM].acquire()
+        row[0] = timestamp
+        row[1] = action
+        row[2] = power
+        self._queues[Stream.COM].append(row)
         if action != 'neutral':
-            print(f"Mental Command: {action} (power: {power:.2f})")
+            self._last_command = (action, power)
         
     def on_new_sys_data(self, *args, **kwargs):
+        if not self._has_headers('sys'):
+            return
         data = kwargs.get('data')
         timestamp = time.time()
         row = [timestamp] + data if isinstance(data, list) else [timestamp, str(data)]
-        self.data_buffer['sys'].append(row)
+        self._queues[Stream.SYS].append(row)
         
     def on_inform_error(self, *args, **kwargs):
         error_data = kwargs.get('error_data')
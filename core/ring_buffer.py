@@ -0,0 +1,83 @@
+from collections import deque
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of numeric sample rows for one producer and one consumer.
+
+    The Cortex websocket thread pushes rows while a background thread drains
+    them. The producer only advances ``head`` and the consumer only advances
+    ``tail``; both are monotonically increasing ints whose stores are atomic
+    under the GIL, so neither side takes a lock on the per-sample path.
+
+    The capacity is rounded up to a power of two so a slot index is a mask
+    of the counter rather than a modulo.
+    """
+
+    def __init__(self, capacity, width, dtype=np.float32):
+        capacity = 1 << max(capacity - 1, 0).bit_length()
+        self.capacity = capacity
+        self._mask = capacity - 1
+        # Timestamps stay float64: epoch seconds need more precision than
+        # float32 offers, while the sample values do not
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty((capacity, width), dtype=dtype)
+        self.head = 0  # total rows pushed
+        self.tail = 0  # total rows drained
+        self.dropped = 0
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, timestamp, values):
+        """Store one row; returns the number of rows pushed so far."""
+        head = self.head
+        if head - self.tail == self.capacity:
+            # Consumer fell a full ring behind: drop rather than overwrite
+            self.dropped += 1
+            return head
+        i = head & self._mask
+        self.times[i] = timestamp
+        self.values[i] = values
+        # Publish the row only after it is fully written
+        self.head = head + 1
+        return head + 1
+
+    def drain(self):
+        """Copy out every row pushed since the last drain as (times, values), oldest first."""
+        head = self.head
+        tail = self.tail
+        start = tail & self._mask
+        stop = head & self._mask
+        if head == tail:
+            times, values = self.times[:0].copy(), self.values[:0].copy()
+        elif start < stop:
+            times, values = self.times[start:stop].copy(), self.values[start:stop].copy()
+        else:
+            times = np.concatenate((self.times[start:], self.times[:stop]))
+            values = np.concatenate((self.values[start:], self.values[:stop]))
+        self.tail = head
+        return times, values
+
+
+class RowPool:
+    """
+    Free list of fixed-width row lists for the string-valued streams.
+
+    The producer takes a row with ``acquire`` and fills it in place; once the
+    consumer has written rows out it hands them back with ``release`` so the
+    next samples reuse them instead of allocating new lists. ``deque.pop`` and
+    ``deque.extend`` are atomic, so both threads can use the pool unlocked.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self._free = deque()
+
+    def acquire(self):
+        free = self._free
+        return free.pop() if free else [None] * self.width
+
+    def release(self, rows):
+        self._free.extend(rows)
@@ -0,0 +1,69 @@
+import json
+import socket
+import struct
+import time
+
+try:
+    import pylsl
+except ImportError:  # LSL output is optional
+    pylsl = None
+
+# Frame header: magic, frame type, stream name, sample count, values per sample
+FRAME_HEADER = struct.Struct('<4sB3sIH')
+FRAME_MAGIC = b'EMOR'
+FRAME_LABELS = 0
+FRAME_SAMPLES = 1
+
+
+class TcpSampleStreamer:
+    """
+    Streams numeric sample blocks to a recorder over one TCP connection.
+
+    Every block is sent as a single frame: a FRAME_HEADER followed by the
+    float64 timestamps and then the row-major sample values in their stored
+    dtype, both little-endian. Before the first block of a stream a labels
+    frame carries the stream's column names as a JSON list.
+    """
+
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._announced = set()
+
+    def send_block(self, stream_name, times, values, headers):
+        name = stream_name.encode('ascii')
+        if stream_name not in self._announced:
+            payload = json.dumps(headers).encode('utf-8')
+            self.sock.sendall(FRAME_HEADER.pack(FRAME_MAGIC, FRAME_LABELS, name, len(payload), 0) + payload)
+            self._announced.add(stream_name)
+        header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_SAMPLES, name, len(times), values.shape[1])
+        self.sock.sendall(header + times.astype('<f8').tobytes() + values.astype(values.dtype.newbyteorder('<')).tobytes())
+
+    def close(self):
+        self.sock.close()
+
+
+class LslSampleStreamer:
+    """Publishes each numeric stream as a Lab Streaming Layer outlet."""
+
+    def __init__(self, source_id='EmoRobots'):
+        if pylsl is None:
+            raise ImportError("LSL streaming requires pylsl. Please run: pip install pylsl")
+        self.source_id = source_id
+        self._outlets = {}
+        # Cortex timestamps are epoch seconds; LSL expects its local clock
+        self._clock_offset = pylsl.local_clock() - time.time()
+
+    def send_block(self, stream_name, times, values, headers):
+        outlet = self._outlets.get(stream_name)
+        if outlet is None:
+            info = pylsl.StreamInfo(f'Emotiv-{stream_name}', stream_name.upper(), values.shape[1],
+                                    pylsl.IRREGULAR_RATE, pylsl.cf_float32, f'{self.source_id}-{stream_name}')
+            channels = info.desc().append_child('channels')
+            for label in headers[1:]:
+                channels.append_child('channel').append_child_value('label', label)
+            outlet = self._outlets[stream_name] = pylsl.StreamOutlet(info)
+        outlet.push_chunk(values, (times + self._clock_offset).tolist())
+
+    def close(self):
+        self._outlets = {}
@@ -0,0 +1,119 @@
+"""
+Analysis Utilities Module
+
+This module holds the array helpers shared by the individual analyzers.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+def pairwise_correlation(x: np.ndarray, y: Optional[np.ndarray] = None,
+                         x_valid: Optional[np.ndarray] = None,
+                         y_valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Pearson correlation of every column of x with every column of y.
+    
+    Each pair uses only the rows where both columns are valid, matching
+    Series.corr and DataFrame.corr, but all pairs come out of a few matrix
+    products instead of one pandas call per pair.
+    
+    Args:
+        x: Array of shape (n_samples, n_x), NaN marking missing values
+        y: Array of shape (n_samples, n_y), NaN marking missing values;
+            defaults to x, giving the correlation matrix of x's columns
+        x_valid: Non-NaN mask of x, when the caller already has it
+        y_valid: Non-NaN mask of y, when the caller already has it
+        
+    Returns:
+        Array of shape (n_x, n_y), NaN where a pair has fewer than two
+        shared samples or no variance
+    """
+    if x_valid is None:
+        x_valid = ~np.isnan(x)
+    if y is None:
+        y, y_valid = x, x_valid
+    elif y_valid is None:
+        y_valid = ~np.isnan(y)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if y is x and x_valid.all():
+            # Every pair shares all rows: one Gram matrix of the centered columns
+            centered = x - x.sum(axis=0) / len(x)
+            cov = centered.T @ centered
+            n = np.full(cov.shape, len(x))
+            var_x = np.broadcast_to(np.diag(cov)[:, np.newaxis], cov.shape)
+            var_y = var_x.T
+        else:
+            # Center on the column means first; correlation is shift invariant
+            # and the sums of squares below then do not cancel catastrophically
+            x = np.where(x_valid, x, 0.0)
+            y = np.where(y_valid, y, 0.0)
+            x = np.where(x_valid, x - x.sum(axis=0) / x_valid.sum(axis=0), 0.0)
+            y = np.where(y_valid, y - y.sum(axis=0) / y_valid.sum(axis=0), 0.0)
+            x_valid = x_valid.astype(x.dtype)
+            y_valid = y_valid.astype(y.dtype)
+            
+            # Entry (i, j) of each product sums column i of one side over the
+            # rows where column j of the other side is valid too
+            n = x_valid.T @ y_valid
+            sum_x = x.T @ y_valid
+            sum_y = x_valid.T @ y
+            cov = x.T @ y - sum_x * sum_y / n
+            var_x = (x * x).T @ y_valid - sum_x ** 2 / n
+            var_y = x_valid.T @ (y * y) - sum_y ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    
+    corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def lttb_indices(index: pd.Index, values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick samples with Largest-Triangle-Three-Buckets downsampling.
+    
+    The first and last samples are kept; in between, each bucket keeps
+    the sample forming the largest triangle with the previously kept
+    sample and the average of the next bucket.
+    
+    Args:
+        index: Sample positions (timestamps or numbers)
+        values: Sample values
+        n_out: Number of samples to keep
+        
+    Returns:
+        Sorted integer positions of the kept samples
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+        
+    # Relative positions; uniform scaling does not change the triangles
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    x = (x - x[0]).astype(np.float64)
+    y = values
+    
+    # n_out - 2 buckets over the samples between the first and the last
+    bounds = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    
+    # Average of the bucket after each one; the last bucket looks ahead
+    # to the final sample
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    starts, stops = bounds[1:-1], bounds[2:]
+    counts = stops - starts
+    next_x = np.append((x_sums[stops] - x_sums[starts]) / counts, x[-1])
+    next_y = np.append((y_sums[stops] - y_sums[starts]) / counts, y[-1])
+    
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        lo, hi = bounds[k], bounds[k + 1]
+        areas = np.abs((x[a] - next_x[k]) * (y[lo:hi] - y[a])
+                       - (x[a] - x[lo:hi]) * (next_y[k] - y[a]))
+        a = lo + int(areas.argmax())
+        keep[k + 1] = a
+        
+    return keep
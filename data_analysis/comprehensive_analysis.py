@@ -9,15 +9,83 @@ import numpy as np
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from scipy import signal
+from scipy.integrate import trapezoid
 import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from analysis_utils import pairwise_correlation
 from data_loader import DataLoader, load_session_data
 from eeg_analysis import EEGAnalyzer
 from mental_state_analysis import MentalStateAnalyzer
 from motion_analysis import MotionAnalyzer
 
+# Column prefixes DataLoader.synchronize_data gives the non-EEG data types
+SYNC_PREFIXES = ('met', 'mot', 'pow', 'dev')
+
+# HTML export options: load plotly.js from its CDN instead of embedding the
+# ~3.5 MB bundle in every file, and skip re-validating figures built here
+HTML_OPTIONS = {'include_plotlyjs': 'cdn', 'full_html': True, 'validate': False}
+
+# Per-analyzer outputs of run_full_analysis: progress label, report method
+# and key, figure method, HTML file name and key
+ANALYZER_OUTPUTS = {
+    'eeg': ('EEG analysis', 'generate_report', 'eeg_report',
+            'plot_all_channels_summary', 'eeg_analysis_summary.html', 'eeg_summary'),
+    'mental': ('Mental state analysis', 'generate_mental_state_report', 'mental_report',
+               'create_timeline_plot', 'mental_state_timeline.html', 'mental_timeline'),
+    'motion': ('Motion analysis', 'generate_motion_report', 'motion_report',
+               'create_motion_timeline', 'motion_analysis_timeline.html', 'motion_timeline'),
+}
+
+
+def _write_analyzer_outputs(kind: str, analyzer, output_dir: str) -> Dict[str, str]:
+    """
+    Write the report and main figure of one analyzer.
+    
+    Module level so it can run in a worker process.
+    
+    Args:
+        kind: Key of the analyzer in ANALYZER_OUTPUTS
+        analyzer: EEG, mental state or motion analyzer
+        output_dir: Directory to save the outputs
+        
+    Returns:
+        Dictionary with paths to generated files
+    """
+    _, report_method, report_key, figure_method, figure_name, figure_key = ANALYZER_OUTPUTS[kind]
+    output_files = {report_key: getattr(analyzer, report_method)(output_dir)}
+    
+    figure_path = os.path.join(output_dir, figure_name)
+    getattr(analyzer, figure_method)().write_html(figure_path, **HTML_OPTIONS)
+    output_files[figure_key] = figure_path
+    
+    return output_files
+
+
+def _masked_std(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Sample standard deviation of each column over the rows selected by mask.
+    
+    Args:
+        values: Array of shape (n_samples, n_columns)
+        mask: Boolean array of the same shape
+        
+    Returns:
+        Array of n_columns standard deviations, NaN where fewer than two
+        rows are selected
+    """
+    count = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, values, 0.0).sum(axis=0) / count
+        squares = np.where(mask, values - mean, 0.0) ** 2
+        std = np.sqrt(squares.sum(axis=0) / (count - 1))
+    std[count < 2] = np.nan
+    return std
+
 
 class ComprehensiveAnalyzer:
     """Integrated analysis across all data types."""
@@ -31,6 +99,9 @@ class ComprehensiveAnalyzer:
         """
         self.data_directory = data_directory
         self.loader, self.data = load_session_data(data_directory)
+        self._sync_cache = None
+        self._column_groups = {}
+        self._analysis_cache = {}
         
         # Initialize individual analyzers
         self.analyzers = {}
@@ -45,8 +116,45 @@ class ComprehensiveAnalyzer:
             self.analyzers['motion'] = MotionAnalyzer(self.loader)
     
     def synchronize_all_data(self) -> pd.DataFrame:
-        """Synchronize all data types to common timebase."""
-        return self.loader.synchronize_data()
+        """
+        Synchronize all data types to common timebase.
+        
+        The session data does not change after loading, so the synchronized
+        frame is computed once and shared by every cross-analysis. Treat it
+        as read-only.
+        """
+        if self._sync_cache is None:
+            self._sync_cache = self.loader.synchronize_data()
+            self._column_groups = self._classify_columns(self._sync_cache.columns)
+        return self._sync_cache
+    
+    def _cached_analysis(self, name: str, analysis) -> Dict:
+        """Run a cross-analysis once per analyzer and reuse its results."""
+        if name not in self._analysis_cache:
+            self._analysis_cache[name] = analysis()
+        return self._analysis_cache[name]
+    
+    def _classify_columns(self, columns: pd.Index) -> Dict[str, pd.Index]:
+        """
+        Group synchronized columns by the data type they came from.
+        
+        Args:
+            columns: Columns of the synchronized DataFrame
+            
+        Returns:
+            Dictionary mapping 'eeg' (unprefixed columns) and each of
+            SYNC_PREFIXES to its columns, in their original order
+        """
+        # One prefix code per column: 0 for EEG, i + 1 for SYNC_PREFIXES[i]
+        names = columns.astype(str)
+        codes = np.select(
+            [np.asarray(names.str.startswith(f'{kind}_'), dtype=bool) for kind in SYNC_PREFIXES],
+            np.arange(1, len(SYNC_PREFIXES) + 1),
+            default=0
+        )
+        groups = {kind: columns[codes == code] for code, kind in enumerate(SYNC_PREFIXES, 1)}
+        groups['eeg'] = columns[codes == 0]
+        return groups
     
     def analyze_eeg_mental_correlations(self) -> Dict[str, pd.DataFrame]:
         """
@@ -67,27 +175,34 @@ class ComprehensiveAnalyzer:
             return correlations
             
         # Extract EEG channels and mental metrics
-        eeg_columns = [col for col in sync_data.columns if not col.startswith('met_')]
-        mental_columns = [col for col in sync_data.columns if col.startswith('met_')]
+        mental_columns = self._column_groups['met']
+        eeg_columns = sync_data.columns.drop(mental_columns)
         
         # Calculate correlations between EEG and mental states
-        if eeg_columns and mental_columns:
-            eeg_data = sync_data[eeg_columns]
-            mental_data = sync_data[mental_columns]
+        if len(eeg_columns) and len(mental_columns):
+            eeg_data = sync_data[eeg_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            mental_data = sync_data[mental_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            
+            # Leave columns without a single sample out of the products;
+            # their correlations stay NaN
+            eeg_samples = ~np.isnan(eeg_data)
+            mental_samples = ~np.isnan(mental_data)
+            eeg_valid = eeg_samples.any(axis=0)
+            mental_valid = mental_samples.any(axis=0)
+            corr = np.full((len(eeg_columns), len(mental_columns)), np.nan)
+            if eeg_valid.any() and mental_valid.any():
+                corr[np.ix_(eeg_valid, mental_valid)] = pairwise_correlation(
+                    eeg_data[:, eeg_valid], mental_data[:, mental_valid],
+                    eeg_samples[:, eeg_valid], mental_samples[:, mental_valid]
+                )
             
             # Cross-correlation matrix
             cross_corr = pd.DataFrame(
+                corr,
                 index=eeg_columns,
-                columns=mental_columns,
-                dtype=float
+                columns=mental_columns
             )
             
-            for eeg_col in eeg_columns:
-                for mental_col in mental_columns:
-                    if not sync_data[eeg_col].isna().all() and not sync_data[mental_col].isna().all():
-                        corr = sync_data[eeg_col].corr(sync_data[mental_col])
-                        cross_corr.loc[eeg_col, mental_col] = corr
-            
             correlations['eeg_mental_correlation'] = cross_corr
             
         return correlations
@@ -127,41 +242,56 @@ class ComprehensiveAnalyzer:
                     )
                     
                     # Analyze EEG quality vs motion
-                    eeg_columns = [col for col in sync_data.columns 
-                                 if not col.startswith(('met_', 'mot_', 'pow_', 'dev_'))]
+                    eeg_columns = self._column_groups['eeg']
                     
                     motion_impact = {}
                     
-                    for eeg_channel in eeg_columns[:5]:  # Limit to first 5 channels
-                        if eeg_channel in sync_data.columns:
-                            eeg_signal = sync_data[eeg_channel].dropna()
-                            
-                            if len(eeg_signal) > 10 and not acc_resampled.isna().all():
-                                # Calculate correlation with motion
-                                common_idx = eeg_signal.index.intersection(acc_resampled.index)
-                                if len(common_idx) > 10:
-                                    eeg_common = eeg_signal.loc[common_idx]
-                                    motion_common = acc_resampled.loc[common_idx]
-                                    
-                                    # Remove NaN values
-                                    valid_mask = ~(eeg_common.isna() | motion_common.isna())
-                                    if valid_mask.sum() > 10:
-                                        correlation = eeg_common[valid_mask].corr(motion_common[valid_mask])
-                                        
-                                        # Calculate signal variability during high motion
-                                        high_motion_threshold = motion_common.quantile(0.8)
-                                        high_motion_mask = motion_common > high_motion_threshold
-                                        
-                                        if high_motion_mask.sum() > 0:
-                                            high_motion_std = eeg_common[high_motion_mask].std()
-                                            low_motion_std = eeg_common[~high_motion_mask].std()
-                                            
-                                            motion_impact[eeg_channel] = {
-                                                'motion_correlation': correlation,
-                                                'high_motion_variability': high_motion_std,
-                                                'low_motion_variability': low_motion_std,
-                                                'variability_ratio': high_motion_std / low_motion_std if low_motion_std > 0 else np.nan
-                                            }
+                    # All channels are scored together against the one motion
+                    # vector, each over its own valid samples
+                    eeg_channels = eeg_columns[:5]  # Limit to first 5 channels
+                    eeg = sync_data[eeg_channels].to_numpy(dtype=np.float64, na_value=np.nan)
+                    motion = acc_resampled.to_numpy()
+                    eeg_valid = ~np.isnan(eeg)
+                    motion_valid = ~np.isnan(motion)
+                    
+                    # Flat (constant or empty) channels can only give NaN
+                    # correlations and ratios, so skip them up front
+                    spread = (np.where(eeg_valid, eeg, -np.inf).max(axis=0)
+                              - np.where(eeg_valid, eeg, np.inf).min(axis=0))
+                    varying = spread > 0
+                    eeg_channels = eeg_channels[varying]
+                    eeg = eeg[:, varying]
+                    eeg_valid = eeg_valid[:, varying]
+                    
+                    if len(eeg_channels) and motion_valid.any():
+                        # One validity mask per channel, shared by every
+                        # statistic below instead of per-channel dropna and
+                        # index intersections
+                        pair_valid = eeg_valid & motion_valid[:, None]
+                        n_eeg = eeg_valid.sum(axis=0)
+                        n_pairs = pair_valid.sum(axis=0)
+                        correlations = pairwise_correlation(eeg, motion[:, None],
+                                                            eeg_valid, motion_valid[:, None])[:, 0]
+                        
+                        # Signal variability during high motion, taking the
+                        # motion threshold over each channel's samples
+                        channel_motion = np.where(eeg_valid, motion[:, None], np.nan)
+                        with warnings.catch_warnings():
+                            warnings.simplefilter('ignore', RuntimeWarning)
+                            high_motion_threshold = np.nanquantile(channel_motion, 0.8, axis=0)
+                        with np.errstate(invalid='ignore'):
+                            high_motion_mask = channel_motion > high_motion_threshold
+                        high_motion_std = _masked_std(eeg, high_motion_mask)
+                        low_motion_std = _masked_std(eeg, eeg_valid & ~high_motion_mask)
+                        
+                        for i, eeg_channel in enumerate(eeg_channels):
+                            if n_eeg[i] > 10 and n_pairs[i] > 10 and high_motion_mask[:, i].any():
+                                motion_impact[eeg_channel] = {
+                                    'motion_correlation': correlations[i],
+                                    'high_motion_variability': high_motion_std[i],
+                                    'low_motion_variability': low_motion_std[i],
+                                    'variability_ratio': high_motion_std[i] / low_motion_std[i] if low_motion_std[i] > 0 else np.nan
+                                }
                     
                     results['motion_artifact_impact'] = motion_impact
                     
@@ -222,14 +352,24 @@ class ComprehensiveAnalyzer:
                         # Calculate alpha power in windows
                         window_size = min(len(filtered_data) // 10, 1000)
                         if window_size > 100:
-                            alpha_power = []
-                            timestamps = []
+                            # Same Welch estimate as extract_band_power, for
+                            # the alpha band only and for all half-overlapping
+                            # windows in one batched call
+                            values = filtered_data.to_numpy(dtype=np.float64)
+                            starts = np.arange(0, len(values) - window_size, window_size // 2)
+                            windows = np.lib.stride_tricks.sliding_window_view(values, window_size)
+                            windows = windows[::window_size // 2][:len(starts)]
+                            nperseg = min(window_size // 4, int(2 * eeg_analyzer.sampling_rate))
+                            frequencies, psd = signal.welch(windows, fs=eeg_analyzer.sampling_rate,
+                                                            nperseg=nperseg, axis=-1)
                             
-                            for i in range(0, len(filtered_data) - window_size, window_size // 2):
-                                window_data = filtered_data.iloc[i:i + window_size]
-                                band_powers = eeg_analyzer.extract_band_power(window_data)
-                                alpha_power.append(band_powers.get('alpha', 0))
-                                timestamps.append(window_data.index[len(window_data) // 2])
+                            low_freq, high_freq = eeg_analyzer.frequency_bands['alpha']
+                            alpha_mask = (frequencies >= low_freq) & (frequencies <= high_freq)
+                            if np.any(alpha_mask):
+                                alpha_power = trapezoid(psd[:, alpha_mask], frequencies[alpha_mask], axis=-1)
+                            else:
+                                alpha_power = np.zeros(len(starts))
+                            timestamps = filtered_data.index[starts + window_size // 2]
                             
                             fig.add_trace(
                                 go.Scatter(x=timestamps, y=alpha_power,
@@ -246,15 +386,17 @@ class ComprehensiveAnalyzer:
             mental_analyzer = self.analyzers['mental']
             if mental_analyzer.metrics:
                 # Show first few metrics
+                traces = []
                 for i, metric in enumerate(mental_analyzer.metrics[:3]):
                     if metric in mental_analyzer.mental_data.columns:
                         data = mental_analyzer.mental_data[metric].dropna()
                         if len(data) > 0:
-                            fig.add_trace(
-                                go.Scatter(x=data.index, y=data.values,
-                                         name=metric.capitalize(), mode='lines'),
-                                row=row, col=col
+                            traces.append(
+                                go.Scattergl(x=data.index, y=data.to_numpy(),
+                                             name=metric.capitalize(), mode='lines')
                             )
+                if traces:
+                    fig.add_traces(traces, rows=row, cols=col)
         
         # Motion plot
         if 'motion' in self.analyzers:
@@ -262,17 +404,17 @@ class ComprehensiveAnalyzer:
             row = ((plot_idx - 1) // cols) + 1
             col = ((plot_idx - 1) % cols) + 1
             
-            motion_analyzer = self.analyzers['motion']
-            angles = motion_analyzer.calculate_head_orientation()
+            angles = self.analyzers['motion'].calculate_head_orientation()
             
             if not angles.empty:
-                for angle_type in ['roll', 'pitch', 'yaw']:
-                    if angle_type in angles.columns:
-                        fig.add_trace(
-                            go.Scatter(x=angles.index, y=angles[angle_type],
-                                     name=angle_type.capitalize(), mode='lines'),
-                            row=row, col=col
-                        )
+                traces = [
+                    go.Scattergl(x=angles.index, y=angles[angle_type].to_numpy(),
+                                 name=angle_type.capitalize(), mode='lines')
+                    for angle_type in ['roll', 'pitch', 'yaw']
+                    if angle_type in angles.columns
+                ]
+                if traces:
+                    fig.add_traces(traces, rows=row, cols=col)
         
         fig.update_layout(
             title="Comprehensive Data Analysis Dashboard",
@@ -288,118 +430,144 @@ class ComprehensiveAnalyzer:
         
         report_path = os.path.join(output_dir, "comprehensive_analysis_report.txt")
         
-        with open(report_path, 'w') as f:
-            f.write("Comprehensive EEG and Sensor Data Analysis Report\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Session information
-            f.write("Session Information:\n")
-            f.write("-" * 20 + "\n")
-            f.write(f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Data Directory: {self.data_directory}\n")
+        # Run the cross-analyses up front; the report lines are collected in
+        # memory and written with a single call
+        correlations = self._cached_analysis('eeg_mental', self.analyze_eeg_mental_correlations)
+        motion_impact = self._cached_analysis('motion_artifact', self.analyze_motion_artifact_impact)
+        
+        lines = [
+            "Comprehensive EEG and Sensor Data Analysis Report\n",
+            "=" * 60 + "\n\n",
+        ]
+        
+        # Session information
+        lines.extend([
+            "Session Information:\n",
+            "-" * 20 + "\n",
+            f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Data Directory: {self.data_directory}\n",
+        ])
+        
+        data_info = self.loader.get_data_info()
+        for data_type, info in data_info.items():
+            lines.extend([
+                f"\n{data_type.upper()} Data:\n",
+                f"  Shape: {info['shape']}\n",
+                f"  Duration: {info.get('duration', 'N/A')} seconds\n",
+                f"  Sampling Rate: {info.get('sampling_rate', 'N/A')} Hz\n",
+            ])
+        
+        # Individual analysis summaries
+        lines.extend([
+            "\n\nAnalysis Summary:\n",
+            "-" * 20 + "\n",
+        ])
+        
+        if 'eeg' in self.analyzers:
+            lines.append("\nEEG Analysis:\n")
+            eeg_analyzer = self.analyzers['eeg']
+            lines.append(f"  Channels analyzed: {len(eeg_analyzer.channels)}\n")
             
-            data_info = self.loader.get_data_info()
-            for data_type, info in data_info.items():
-                f.write(f"\n{data_type.upper()} Data:\n")
-                f.write(f"  Shape: {info['shape']}\n")
-                f.write(f"  Duration: {info.get('duration', 'N/A')} seconds\n")
-                f.write(f"  Sampling Rate: {info.get('sampling_rate', 'N/A')} Hz\n")
+            # Quick EEG summary
+            if eeg_analyzer.channels:
+                sample_channel = eeg_analyzer.channels[0]
+                if sample_channel in eeg_analyzer.eeg_data.columns:
+                    data = eeg_analyzer.eeg_data[sample_channel].dropna()
+                    lines.extend([
+                        f"  Sample channel ({sample_channel}) statistics:\n",
+                        f"    Mean: {data.mean():.2f} µV\n",
+                        f"    Std: {data.std():.2f} µV\n",
+                    ])
+        
+        if 'mental' in self.analyzers:
+            lines.append("\nMental State Analysis:\n")
+            mental_analyzer = self.analyzers['mental']
+            lines.append(f"  Metrics analyzed: {len(mental_analyzer.metrics)}\n")
             
-            # Individual analysis summaries
-            f.write("\n\nAnalysis Summary:\n")
-            f.write("-" * 20 + "\n")
+            # Mental state summary
+            basic_stats = mental_analyzer.get_basic_statistics()
+            if basic_stats:
+                avg_attention = basic_stats.get('attention', {}).get('mean', 0)
+                avg_engagement = basic_stats.get('eng', {}).get('mean', 0)
+                lines.extend([
+                    f"  Average attention: {avg_attention:.3f}\n",
+                    f"  Average engagement: {avg_engagement:.3f}\n",
+                ])
+        
+        if 'motion' in self.analyzers:
+            lines.append("\nMotion Analysis:\n")
+            angles = self.analyzers['motion'].calculate_head_orientation()
             
-            if 'eeg' in self.analyzers:
-                f.write("\nEEG Analysis:\n")
-                eeg_analyzer = self.analyzers['eeg']
-                f.write(f"  Channels analyzed: {len(eeg_analyzer.channels)}\n")
-                
-                # Quick EEG summary
-                if eeg_analyzer.channels:
-                    sample_channel = eeg_analyzer.channels[0]
-                    if sample_channel in eeg_analyzer.eeg_data.columns:
-                        data = eeg_analyzer.eeg_data[sample_channel].dropna()
-                        f.write(f"  Sample channel ({sample_channel}) statistics:\n")
-                        f.write(f"    Mean: {data.mean():.2f} µV\n")
-                        f.write(f"    Std: {data.std():.2f} µV\n")
+            if not angles.empty:
+                lines.append("  Head orientation variability:\n")
+                for angle_type in ['roll', 'pitch', 'yaw']:
+                    if angle_type in angles.columns:
+                        std_dev = angles[angle_type].std()
+                        lines.append(f"    {angle_type.capitalize()}: {std_dev:.2f}°\n")
+        
+        # Cross-analysis insights
+        if correlations:
+            lines.extend([
+                "\n\nCross-Analysis Insights:\n",
+                "-" * 25 + "\n",
+            ])
             
-            if 'mental' in self.analyzers:
-                f.write("\nMental State Analysis:\n")
-                mental_analyzer = self.analyzers['mental']
-                f.write(f"  Metrics analyzed: {len(mental_analyzer.metrics)}\n")
+            if 'eeg_mental_correlation' in correlations:
+                corr_matrix = correlations['eeg_mental_correlation']
+                # Find strongest correlations
+                max_corr = 0
+                max_pair = None
                 
-                # Mental state summary
-                basic_stats = mental_analyzer.get_basic_statistics()
-                if basic_stats:
-                    avg_attention = basic_stats.get('attention', {}).get('mean', 0)
-                    avg_engagement = basic_stats.get('eng', {}).get('mean', 0)
-                    f.write(f"  Average attention: {avg_attention:.3f}\n")
-                    f.write(f"  Average engagement: {avg_engagement:.3f}\n")
-            
-            if 'motion' in self.analyzers:
-                f.write("\nMotion Analysis:\n")
-                motion_analyzer = self.analyzers['motion']
-                angles = motion_analyzer.calculate_head_orientation()
+                values = corr_matrix.to_numpy(dtype=np.float64)
+                if not np.isnan(values).all():
+                    i, j = np.unravel_index(np.nanargmax(np.abs(values)), values.shape)
+                    if values[i, j] != 0:
+                        max_corr = values[i, j]
+                        max_pair = (corr_matrix.index[i], corr_matrix.columns[j])
                 
-                if not angles.empty:
-                    f.write("  Head orientation variability:\n")
-                    for angle_type in ['roll', 'pitch', 'yaw']:
-                        if angle_type in angles.columns:
-                            std_dev = angles[angle_type].std()
-                            f.write(f"    {angle_type.capitalize()}: {std_dev:.2f}°\n")
+                if max_pair:
+                    lines.extend([
+                        f"Strongest EEG-Mental correlation: {max_corr:.3f}\n",
+                        f"  Between {max_pair[0]} and {max_pair[1].replace('met_', '')}\n",
+                    ])
+        
+        if motion_impact and 'motion_artifact_impact' in motion_impact:
+            lines.append("\nMotion Artifact Impact:\n")
+            impact_data = motion_impact['motion_artifact_impact']
             
-            # Cross-analysis insights
-            correlations = self.analyze_eeg_mental_correlations()
-            if correlations:
-                f.write("\n\nCross-Analysis Insights:\n")
-                f.write("-" * 25 + "\n")
-                
-                if 'eeg_mental_correlation' in correlations:
-                    corr_matrix = correlations['eeg_mental_correlation']
-                    # Find strongest correlations
-                    max_corr = 0
-                    max_pair = None
-                    
-                    for eeg_col in corr_matrix.index:
-                        for mental_col in corr_matrix.columns:
-                            corr_val = corr_matrix.loc[eeg_col, mental_col]
-                            if not pd.isna(corr_val) and abs(corr_val) > abs(max_corr):
-                                max_corr = corr_val
-                                max_pair = (eeg_col, mental_col)
-                    
-                    if max_pair:
-                        f.write(f"Strongest EEG-Mental correlation: {max_corr:.3f}\n")
-                        f.write(f"  Between {max_pair[0]} and {max_pair[1].replace('met_', '')}\n")
+            impact_values = np.array([
+                (data['motion_correlation'], data['variability_ratio'])
+                for data in impact_data.values()
+            ], dtype=np.float64).reshape(-1, 2)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                avg_correlation, avg_ratio = np.nanmean(impact_values, axis=0)
             
-            motion_impact = self.analyze_motion_artifact_impact()
-            if motion_impact and 'motion_artifact_impact' in motion_impact:
-                f.write("\nMotion Artifact Impact:\n")
-                impact_data = motion_impact['motion_artifact_impact']
-                
-                avg_correlation = np.mean([
-                    data['motion_correlation'] 
-                    for data in impact_data.values() 
-                    if not pd.isna(data['motion_correlation'])
-                ])
-                
-                f.write(f"  Average motion-EEG correlation: {avg_correlation:.3f}\n")
-                
-                avg_ratio = np.mean([
-                    data['variability_ratio'] 
-                    for data in impact_data.values() 
-                    if not pd.isna(data['variability_ratio'])
-                ])
-                
-                f.write(f"  Average variability increase during motion: {avg_ratio:.2f}x\n")
+            lines.extend([
+                f"  Average motion-EEG correlation: {avg_correlation:.3f}\n",
+                f"  Average variability increase during motion: {avg_ratio:.2f}x\n",
+            ])
+        
+        with open(report_path, 'w') as f:
+            f.writelines(lines)
         
         return report_path
     
-    def run_full_analysis(self, output_dir: str = "output") -> Dict[str, str]:
+    def run_full_analysis(self, output_dir: str = "output", parallel: bool = False) -> Dict[str, str]:
         """
         Run complete analysis pipeline and save all outputs.
         
+        The per-analyzer reports and figures are independent of each other
+        and of the integrated analysis, so they can run in worker processes
+        while this process builds the integrated outputs. Each worker is sent
+        a pickled copy of its analyzer, including the loaded data, so this
+        only pays off for short recordings on machines with spare cores and
+        memory.
+        
         Args:
             output_dir: Directory to save analysis outputs
+            parallel: Generate the per-analyzer outputs in worker processes
+                (ignored on single-core machines)
             
         Returns:
             Dictionary with paths to generated files
@@ -409,53 +577,51 @@ class ComprehensiveAnalyzer:
         
         print("Running comprehensive analysis...")
         
-        # Generate individual analysis reports
-        if 'eeg' in self.analyzers:
-            print("- EEG analysis...")
-            eeg_report = self.analyzers['eeg'].generate_report(output_dir)
-            output_files['eeg_report'] = eeg_report
-            
-            # EEG visualizations
-            summary_fig = self.analyzers['eeg'].plot_all_channels_summary()
-            eeg_summary_path = os.path.join(output_dir, "eeg_analysis_summary.html")
-            summary_fig.write_html(eeg_summary_path)
-            output_files['eeg_summary'] = eeg_summary_path
+        kinds = [kind for kind in ANALYZER_OUTPUTS if kind in self.analyzers]
         
-        if 'mental' in self.analyzers:
-            print("- Mental state analysis...")
-            mental_report = self.analyzers['mental'].generate_mental_state_report(output_dir)
-            output_files['mental_report'] = mental_report
-            
-            # Mental state visualizations
-            timeline_fig = self.analyzers['mental'].create_timeline_plot()
-            mental_timeline_path = os.path.join(output_dir, "mental_state_timeline.html")
-            timeline_fig.write_html(mental_timeline_path)
-            output_files['mental_timeline'] = mental_timeline_path
+        workers = min(len(kinds), os.cpu_count() or 1)
         
-        if 'motion' in self.analyzers:
-            print("- Motion analysis...")
-            motion_report = self.analyzers['motion'].generate_motion_report(output_dir)
-            output_files['motion_report'] = motion_report
+        if parallel and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for kind in kinds:
+                    print(f"- {ANALYZER_OUTPUTS[kind][0]}...")
+                    futures.append(executor.submit(_write_analyzer_outputs, kind, self.analyzers[kind], output_dir))
+                
+                integrated_files = self._write_integrated_outputs(output_dir)
+                
+                # Keep the per-analyzer files first, in analyzer order
+                for future in futures:
+                    output_files.update(future.result())
+        else:
+            # Generate individual analysis reports
+            for kind in kinds:
+                print(f"- {ANALYZER_OUTPUTS[kind][0]}...")
+                output_files.update(_write_analyzer_outputs(kind, self.analyzers[kind], output_dir))
             
-            # Motion visualizations
-            motion_fig = self.analyzers['motion'].create_motion_timeline()
-            motion_timeline_path = os.path.join(output_dir, "motion_analysis_timeline.html")
-            motion_fig.write_html(motion_timeline_path)
-            output_files['motion_timeline'] = motion_timeline_path
+            integrated_files = self._write_integrated_outputs(output_dir)
+        
+        output_files.update(integrated_files)
+        
+        print(f"Analysis complete! Results saved to {output_dir}")
+        
+        return output_files
+    
+    def _write_integrated_outputs(self, output_dir: str) -> Dict[str, str]:
+        """Write the integrated dashboard and the comprehensive report."""
+        output_files = {}
         
         # Generate integrated analysis
         print("- Integrated analysis...")
         dashboard_fig = self.create_integrated_dashboard()
         dashboard_path = os.path.join(output_dir, "comprehensive_dashboard.html")
-        dashboard_fig.write_html(dashboard_path)
+        dashboard_fig.write_html(dashboard_path, **HTML_OPTIONS)
         output_files['dashboard'] = dashboard_path
         
         # Generate comprehensive report
         comprehensive_report = self.generate_comprehensive_report(output_dir)
         output_files['comprehensive_report'] = comprehensive_report
         
-        print(f"Analysis complete! Results saved to {output_dir}")
-        
         return output_files
 
 
@@ -463,8 +629,11 @@ def main():
     """Main function for standalone execution."""
     import sys
     
-    # Get data directory from command line or use default
-    data_dir = sys.argv[1] if len(sys.argv) > 1 else "../collected_data"
+    # Get data directory from command line or use default; --parallel
+    # writes the per-analyzer reports in worker processes
+    args = [arg for arg in sys.argv[1:] if arg != '--parallel']
+    parallel = len(args) < len(sys.argv) - 1
+    data_dir = args[0] if args else "../collected_data"
     
     if not os.path.exists(data_dir):
         print(f"Data directory {data_dir} not found!")
@@ -474,7 +643,7 @@ def main():
     analyzer = ComprehensiveAnalyzer(data_dir)
     
     # Run full analysis
-    output_files = analyzer.run_full_analysis()
+    output_files = analyzer.run_full_analysis(parallel=parallel)
     
     # Print summary of generated files
     print("\nGenerated files:")
@@ -6,42 +6,78 @@ This module provides utilities to load and preprocess data from the collected CS
 
 import pandas as pd
 import numpy as np
+import csv
 import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
-import glob
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as feather
+except ImportError:  # CSV files are parsed with pandas instead, and not cached
+    pa = pa_csv = feather = None
+
 
 class DataLoader:
     """Unified data loader for all CSV files from the collected_data folder."""
     
-    def __init__(self, data_directory: str):
+    def __init__(self, data_directory: str, feather_cache: bool = False):
         """
         Initialize the data loader.
         
         Args:
             data_directory: Path to the directory containing CSV files
+            feather_cache: Keep each parsed CSV as an uncompressed Feather file
+                next to it and memory-map that instead of re-parsing while the
+                CSV is unchanged (requires pyarrow)
         """
         self.data_directory = data_directory
         self.data_types = ['eeg', 'met', 'mot', 'pow', 'dev']
         self.loaded_data = {}
+        self._files_cache: Optional[Dict[str, List[str]]] = None
+        self.feather_cache = feather_cache and feather is not None
+        # Column selections per data type, with the DataFrame they came from
+        self._columns_cache: Dict[str, Tuple[pd.DataFrame, List[str]]] = {}
         
     def find_csv_files(self) -> Dict[str, List[str]]:
         """
         Find all CSV files in the data directory organized by type.
         
+        The directory is listed once and the result is cached; call
+        invalidate_cache() to pick up files written since.
+        
         Returns:
             Dictionary with data types as keys and file paths as values
         """
-        files_by_type = {}
+        if self._files_cache is not None:
+            return self._files_cache
+            
+        files_by_type = {data_type: [] for data_type in self.data_types}
+        pattern = re.compile(r"data_(%s)_.*\.csv" % "|".join(map(re.escape, self.data_types)))
         
-        for data_type in self.data_types:
-            pattern = os.path.join(self.data_directory, f"data_{data_type}_*.csv")
-            files = glob.glob(pattern)
-            files_by_type[data_type] = sorted(files)
+        try:
+            with os.scandir(self.data_directory) as entries:
+                for entry in entries:
+                    match = pattern.fullmatch(entry.name)
+                    if match:
+                        files_by_type[match.group(1)].append(entry.path)
+        except FileNotFoundError:
+            pass
             
+        for files in files_by_type.values():
+            files.sort()
+            
+        self._files_cache = files_by_type
         return files_by_type
     
+    def invalidate_cache(self):
+        """Forget the cached file listing so the next scan sees new files."""
+        self._files_cache = None
+    
     def load_csv_file(self, file_path: str) -> pd.DataFrame:
         """
         Load a single CSV file with proper preprocessing.
@@ -53,19 +89,78 @@ class DataLoader:
             Preprocessed DataFrame
         """
         try:
-            df = pd.read_csv(file_path)
+            cache_path = file_path + '.feather'
+            if self.feather_cache:
+                cached = self._read_feather_cache(file_path, cache_path)
+                if cached is not None:
+                    return cached
+                    
+            df = self._read_csv(file_path)
             
-            # Convert timestamp to datetime if it exists
+            # Convert timestamp to a datetime index if it exists
             if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-                df.set_index('timestamp', inplace=True)
+                # Dropping keeps the values in one block, pop would split it per column
+                seconds = df['timestamp'].to_numpy(dtype=np.float64)
+                df = df.drop(columns='timestamp')
+                df.index = pd.DatetimeIndex(pd.to_datetime(seconds, unit='s'), name='timestamp')
                 
+            if self.feather_cache:
+                self._write_feather_cache(df, cache_path)
+                    
             return df
             
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
             return pd.DataFrame()
     
+    def _read_feather_cache(self, file_path: str, cache_path: str) -> Optional[pd.DataFrame]:
+        """Memory-map the Feather cache of a CSV file, or None if it is missing, stale or unreadable."""
+        try:
+            if os.path.getmtime(cache_path) < os.path.getmtime(file_path):
+                return None
+            return feather.read_feather(cache_path, memory_map=True)
+        except (OSError, pa.ArrowException):
+            return None  # Parse the CSV again and replace the cache
+    
+    def _write_feather_cache(self, df: pd.DataFrame, cache_path: str):
+        """Write the Feather cache through a temporary file so readers never see a partial one."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.feather.tmp',
+                                            dir=os.path.dirname(cache_path) or '.')
+            os.close(fd)
+        except OSError:
+            return  # Read-only directory: parse again next time
+            
+        try:
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, cache_path)
+        except (OSError, pa.ArrowException):
+            # Uncacheable frame: drop the partial file and parse again next time
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _read_csv(self, file_path: str) -> pd.DataFrame:
+        """Parse a CSV file, with pyarrow's multithreaded reader when available."""
+        if pa_csv is None:
+            return pd.read_csv(file_path)
+            
+        # The collector writes numeric columns only. pyarrow infers a column's
+        # type from the first block alone, so pin every column to float64
+        # rather than let one that starts out integral reject later fractions
+        with open(file_path, newline='') as f:
+            columns = next(csv.reader(f), [])
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.float64() for name in columns})
+        
+        try:
+            table = pa_csv.read_csv(file_path, convert_options=convert_options)
+        except pa.ArrowInvalid:
+            # Older recordings with boolean or text columns
+            return pd.read_csv(file_path)
+        return table.to_pandas(self_destruct=True)
+    
     def load_all_data(self) -> Dict[str, pd.DataFrame]:
         """
         Load all CSV files and return organized data.
@@ -75,11 +170,19 @@ class DataLoader:
         """
         files_by_type = self.find_csv_files()
         
+        # For now, load the first (most recent) file of each type
+        # You can modify this to combine multiple sessions
+        first_files = {data_type: file_list[0] 
+                       for data_type, file_list in files_by_type.items() if file_list}
+        
+        # CSV parsing releases the GIL, so reading the files from a thread
+        # pool overlaps their disk I/O and parsing
+        with ThreadPoolExecutor(max_workers=max(len(first_files), 1)) as executor:
+            frames = dict(zip(first_files, executor.map(self.load_csv_file, first_files.values())))
+        
         for data_type, file_list in files_by_type.items():
             if file_list:
-                # For now, load the first (most recent) file of each type
-                # You can modify this to combine multiple sessions
-                df = self.load_csv_file(file_list[0])
+                df = frames[data_type]
                 self.loaded_data[data_type] = df
                 print(f"Loaded {data_type} data: {df.shape}")
             else:
@@ -118,30 +221,41 @@ class DataLoader:
                 return 1.0 / avg_interval if avg_interval > 0 else None
         return None
     
+    def _select_columns(self, data_type: str, select) -> List[str]:
+        """
+        Memoized column selection for one loaded data type.
+        
+        Args:
+            data_type: Key into loaded_data
+            select: Function mapping the column Index to the selected columns
+            
+        Returns:
+            List of selected column names
+        """
+        df = self.loaded_data.get(data_type)
+        if df is None or df.empty:
+            return []
+            
+        cached = self._columns_cache.get(data_type)
+        if cached is None or cached[0] is not df:
+            cached = self._columns_cache[data_type] = (df, select(df.columns).tolist())
+        return list(cached[1])
+    
     def get_eeg_channels(self) -> List[str]:
         """Get list of EEG channel names."""
-        if 'eeg' in self.loaded_data and not self.loaded_data['eeg'].empty:
-            # Standard 14-channel Emotiv layout
-            channels = [col for col in self.loaded_data['eeg'].columns 
-                       if col not in ['COUNTER', 'INTERPOLATED', 'RAW_CQ', 'MARKER_HARDWARE']]
-            return channels
-        return []
+        # Standard 14-channel Emotiv layout
+        return self._select_columns('eeg', lambda columns: columns[
+            ~columns.isin(['COUNTER', 'INTERPOLATED', 'RAW_CQ', 'MARKER_HARDWARE'])])
     
     def get_mental_state_metrics(self) -> List[str]:
         """Get list of mental state metric names."""
-        if 'met' in self.loaded_data and not self.loaded_data['met'].empty:
-            metrics = [col for col in self.loaded_data['met'].columns 
-                      if not col.endswith('.isActive')]
-            return metrics
-        return []
+        return self._select_columns('met', lambda columns: columns[
+            ~columns.astype(str).str.endswith('.isActive')])
     
     def get_motion_sensors(self) -> List[str]:
         """Get list of motion sensor channels."""
-        if 'mot' in self.loaded_data and not self.loaded_data['mot'].empty:
-            sensors = [col for col in self.loaded_data['mot'].columns 
-                      if col not in ['COUNTER_MEMS', 'INTERPOLATED_MEMS']]
-            return sensors
-        return []
+        return self._select_columns('mot', lambda columns: columns[
+            ~columns.isin(['COUNTER_MEMS', 'INTERPOLATED_MEMS'])])
     
     def synchronize_data(self, tolerance_seconds: float = 0.1) -> pd.DataFrame:
         """
@@ -188,7 +302,8 @@ class DataLoader:
             return pd.DataFrame()
             
         # Resample other data to match reference timestamps
-        synchronized_df = reference_data.copy()
+        frames = [reference_data]
+        tolerance = pd.Timedelta(seconds=tolerance_seconds)
         
         for data_type, df in self.loaded_data.items():
             if not df.empty and data_type != 'eeg':  # Assuming EEG has highest sampling rate
@@ -196,16 +311,17 @@ class DataLoader:
                 
                 # Resample to match reference timestamps
                 resampled = time_filtered.reindex(
-                    synchronized_df.index, 
+                    reference_data.index, 
                     method='nearest',
-                    tolerance=pd.Timedelta(seconds=tolerance_seconds)
+                    tolerance=tolerance
                 )
                 
                 # Add prefix to column names to avoid conflicts
                 resampled.columns = [f"{data_type}_{col}" for col in resampled.columns]
-                
-                # Merge with synchronized data
-                synchronized_df = synchronized_df.join(resampled, how='inner')
+                frames.append(resampled)
+        
+        # Merge everything in one allocation instead of one join per data type
+        synchronized_df = pd.concat(frames, axis=1, join='inner')
         
         return synchronized_df
 
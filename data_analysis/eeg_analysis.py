@@ -14,10 +14,12 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import signal, stats
 from scipy.fft import fft, fftfreq
+from scipy.integrate import trapezoid
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
-from typing import Dict, List, Tuple, Optional
+import warnings
+from typing import Dict, List, Tuple, Optional, Union
 from data_loader import DataLoader
 
 
@@ -33,8 +35,14 @@ class EEGAnalyzer:
         """
         self.data_loader = data_loader
         self.eeg_data = data_loader.loaded_data.get('eeg', pd.DataFrame())
+        # Time windows are cut with binary-search slicing, which needs a sorted index
+        if not self.eeg_data.index.is_monotonic_increasing:
+            self.eeg_data = self.eeg_data.sort_index()
         self.sampling_rate = self._get_sampling_rate()
         self.channels = data_loader.get_eeg_channels()
+        # Channels x samples, so filtering and spectra run along contiguous rows
+        self._eeg_matrix = np.ascontiguousarray(
+            self.eeg_data[self.channels].to_numpy(dtype=np.float32).T)
         
         # Define EEG frequency bands
         self.frequency_bands = {
@@ -45,6 +53,45 @@ class EEGAnalyzer:
             'gamma': (30, 100)
         }
         
+        # Welch's frequency grid depends only on the window length and the
+        # sampling rate, so locate the band edges once for the default window
+        n_samples = np.count_nonzero(~np.isnan(self._eeg_matrix).any(axis=0))
+        window_length = min(n_samples // 4, int(2 * self.sampling_rate))
+        self._band_frequencies = (np.fft.rfftfreq(window_length, 1 / self.sampling_rate)
+                                  if window_length > 0 else np.empty(0))
+        self._band_slices = self._locate_bands(self._band_frequencies)
+        
+        # Per-channel results memoized by preprocess_signal, compute_psd and
+        # extract_band_power, and filled in by analyze_all_channels; keys
+        # come from _cache_key
+        self._filtered_cache: Dict[Tuple, pd.Series] = {}
+        self._psd_cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._band_cache: Dict[Tuple, Dict[str, float]] = {}
+        
+        # Preprocessing filter cascade, designed once for the sampling rate
+        self.rebuild_filters()
+        
+    def rebuild_filters(self, highpass: float = 0.5, 
+                        lowpass: float = 50.0,
+                        notch: float = 60.0):
+        """
+        Redesign the default preprocessing filters.
+        
+        Args:
+            highpass: High-pass filter frequency
+            lowpass: Low-pass filter frequency
+            notch: Notch filter frequency (power line noise)
+        """
+        self._filter_settings = (lowpass, highpass, notch)
+        self._filter_stages = self._design_filter(lowpass, highpass, notch)
+        self.clear_caches()
+        
+    def clear_caches(self):
+        """Drop the memoized per-channel filter, PSD and band power results."""
+        self._filtered_cache.clear()
+        self._psd_cache.clear()
+        self._band_cache.clear()
+        
     def _get_sampling_rate(self) -> float:
         """Estimate sampling rate from EEG data."""
         info = self.data_loader.get_data_info()
@@ -52,98 +99,226 @@ class EEGAnalyzer:
             return info['eeg']['sampling_rate']
         return 128.0  # Default Emotiv sampling rate
     
+    def _resolve_filters(self, lowpass: Optional[float], highpass: Optional[float],
+                         notch: Optional[float]) -> Tuple[float, float, float]:
+        """Filter settings with the analyzer's filters filling in the ones left out."""
+        return tuple(default if value is None else value 
+                     for value, default in zip((lowpass, highpass, notch), self._filter_settings))
+    
+    def _cache_key(self, channel: str, channel_data: pd.Series,
+                   settings: Tuple[float, float, float], *extra) -> Tuple:
+        """
+        Memo key of a per-channel result.
+        
+        Besides the channel name the key holds the filter settings and the
+        span of samples the result was computed from, so a differently
+        filtered or sliced signal of the same channel is not served a
+        stale result.
+        """
+        span = ((channel_data.index[0], channel_data.index[-1]) 
+                if len(channel_data) else (None, None))
+        return (channel,) + tuple(settings) + (len(channel_data),) + span + extra
+    
     def preprocess_signal(self, channel_data: pd.Series, 
-                         lowpass: float = 50.0, 
-                         highpass: float = 0.5,
-                         notch: float = 60.0) -> pd.Series:
+                         lowpass: Optional[float] = None, 
+                         highpass: Optional[float] = None,
+                         notch: Optional[float] = None,
+                         channel: Optional[str] = None) -> pd.Series:
         """
         Preprocess EEG signal with filtering.
         
         Args:
             channel_data: Raw EEG signal
-            lowpass: Low-pass filter frequency
-            highpass: High-pass filter frequency
-            notch: Notch filter frequency (power line noise)
+            lowpass: Low-pass filter frequency, defaults to the analyzer's filters
+            highpass: High-pass filter frequency, defaults to the analyzer's filters
+            notch: Notch filter frequency (power line noise), defaults to the analyzer's filters
+            channel: Channel name to memoize the result under
             
         Returns:
             Filtered signal
         """
+        settings = self._resolve_filters(lowpass, highpass, notch)
+        key = self._cache_key(channel, channel_data, settings)
+        if channel is not None and key in self._filtered_cache:
+            return self._filtered_cache[key].copy()
+            
         # Remove NaN values
         data = channel_data.dropna()
         
-        if len(data) < 100:  # Need minimum data for filtering
-            return data
+        stages = (self._filter_stages if settings == self._filter_settings 
+                  else self._design_filter(*settings))
+        if len(data) >= 100 and stages:  # Need minimum data for filtering
+            data = pd.Series(self._apply_filter(stages, data.to_numpy()), index=data.index)
+            
+        if channel is not None:
+            self._filtered_cache[key] = data.copy()
+        return data
+    
+    def _design_filter(self, lowpass: float, highpass: float,
+                       notch: float) -> List[Tuple[np.ndarray, int]]:
+        """
+        Design the preprocessing filters as second-order sections.
+        
+        Args:
+            lowpass: Low-pass filter frequency
+            highpass: High-pass filter frequency
+            notch: Notch filter frequency (power line noise)
             
-        # Design filters
+        Returns:
+            List of (SOS array, pad length) stages, empty if no filter applies
+        """
         nyquist = self.sampling_rate / 2
+        stages = []
         
         # High-pass filter (remove DC and low-frequency drift)
         if highpass > 0:
-            high_b, high_a = signal.butter(4, highpass/nyquist, btype='high')
-            data = pd.Series(signal.filtfilt(high_b, high_a, data), index=data.index)
+            stages.append(signal.butter(4, highpass/nyquist, btype='high', output='sos'))
         
         # Low-pass filter (anti-aliasing)
         if lowpass < nyquist:
-            low_b, low_a = signal.butter(4, lowpass/nyquist, btype='low')
-            data = pd.Series(signal.filtfilt(low_b, low_a, data), index=data.index)
+            stages.append(signal.butter(4, lowpass/nyquist, btype='low', output='sos'))
         
         # Notch filter (remove power line noise)
-        if notch > 0:
-            notch_b, notch_a = signal.iirnotch(notch, 30, self.sampling_rate)
-            data = pd.Series(signal.filtfilt(notch_b, notch_a, data), index=data.index)
+        if 0 < notch < nyquist:
+            stages.append(signal.tf2sos(*signal.iirnotch(notch, 30, self.sampling_rate)))
             
+        # Each stage keeps filtfilt's default padding of three filter lengths.
+        # Running the stages as one cascade pads differently, and the edge
+        # transient of the 0.5 Hz high-pass then leaks into the delta band
+        return [(sos, 3 * (2 * len(sos) + 1)) for sos in stages]
+    
+    def _apply_filter(self, stages: List[Tuple[np.ndarray, int]], 
+                      data: np.ndarray, axis: int = -1) -> np.ndarray:
+        """Run each filter stage forwards and backwards along an axis, in float64."""
+        data = np.asarray(data, dtype=np.float64)
+        for sos, padlen in stages:
+            data = signal.sosfiltfilt(sos, data, axis=axis, padlen=padlen)
         return data
     
     def compute_psd(self, channel_data: pd.Series, 
-                    window_length: int = None) -> Tuple[np.ndarray, np.ndarray]:
+                    window_length: int = None,
+                    channel: Optional[str] = None,
+                    lowpass: Optional[float] = None,
+                    highpass: Optional[float] = None,
+                    notch: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Compute Power Spectral Density using Welch's method.
         
         Args:
             channel_data: EEG signal
             window_length: Window length for Welch's method
+            channel: Channel name to memoize the result under
+            lowpass: Low-pass frequency channel_data was filtered with, defaults to the analyzer's filters
+            highpass: High-pass frequency channel_data was filtered with, defaults to the analyzer's filters
+            notch: Notch frequency channel_data was filtered with, defaults to the analyzer's filters
             
         Returns:
-            Tuple of (frequencies, power spectral density)
+            Tuple of (frequencies, power spectral density), read-only when memoized
         """
+        if channel is not None:
+            key = self._cache_key(channel, channel_data,
+                                  self._resolve_filters(lowpass, highpass, notch), window_length)
+            if key in self._psd_cache:
+                return self._psd_cache[key]
+            
+        result = self._welch(channel_data.dropna().to_numpy(dtype=np.float32), window_length)
+        if channel is not None:
+            self._psd_cache[key] = self._freeze(result)
+        return result
+    
+    def _welch(self, data: np.ndarray, 
+               window_length: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Welch PSD along the last axis of a signal or a channels x samples matrix."""
+        # Raw EEG has 14-bit resolution, so single precision loses nothing
+        # here and halves the memory traffic of the FFTs
+        data = np.asarray(data, dtype=np.float32)
         if window_length is None:
-            window_length = min(len(channel_data) // 4, int(2 * self.sampling_rate))
+            window_length = min(data.shape[-1] // 4, int(2 * self.sampling_rate))
             
         frequencies, psd = signal.welch(
-            channel_data.dropna(), 
+            data, 
             fs=self.sampling_rate,
             nperseg=window_length,
-            overlap=window_length//2
+            noverlap=window_length//2,
+            axis=-1
         )
         
         return frequencies, psd
     
-    def extract_band_power(self, channel_data: pd.Series) -> Dict[str, float]:
+    def extract_band_power(self, channel_data: pd.Series,
+                           channel: Optional[str] = None,
+                           lowpass: Optional[float] = None,
+                           highpass: Optional[float] = None,
+                           notch: Optional[float] = None) -> Dict[str, float]:
         """
         Extract power in different frequency bands.
         
         Args:
             channel_data: EEG signal
+            channel: Channel name to memoize the result under
+            lowpass: Low-pass frequency channel_data was filtered with, defaults to the analyzer's filters
+            highpass: High-pass frequency channel_data was filtered with, defaults to the analyzer's filters
+            notch: Notch frequency channel_data was filtered with, defaults to the analyzer's filters
             
         Returns:
             Dictionary with band powers
         """
-        frequencies, psd = self.compute_psd(channel_data)
-        band_powers = {}
+        if channel is not None:
+            key = self._cache_key(channel, channel_data,
+                                  self._resolve_filters(lowpass, highpass, notch))
+            if key in self._band_cache:
+                return dict(self._band_cache[key])
+            
+        frequencies, psd = self.compute_psd(channel_data, channel=channel, lowpass=lowpass,
+                                            highpass=highpass, notch=notch)
+        band_powers = self._integrate_bands(frequencies, psd)
+        if channel is not None:
+            self._band_cache[key] = dict(band_powers)
+        return band_powers
+    
+    @staticmethod
+    def _freeze(arrays: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, ...]:
+        """Mark memoized arrays read-only so callers cannot edit the cache through them."""
+        for array in arrays:
+            array.flags.writeable = False
+        return arrays
+    
+    def _integrate_bands(self, frequencies: np.ndarray, psd: np.ndarray) -> Dict:
+        """
+        Integrate a PSD over each frequency band.
         
-        for band_name, (low_freq, high_freq) in self.frequency_bands.items():
-            # Find frequency indices
-            freq_mask = (frequencies >= low_freq) & (frequencies <= high_freq)
+        Args:
+            frequencies: Frequency grid of the PSD
+            psd: Power spectral density, one row per channel or a single spectrum
             
-            if np.any(freq_mask):
+        Returns:
+            Dictionary with band powers, per channel if psd is a matrix
+        """
+        band_powers = {}
+        if np.array_equal(frequencies, self._band_frequencies):
+            band_slices = self._band_slices
+        else:
+            band_slices = self._locate_bands(frequencies)
+        
+        for band_name, band in band_slices.items():
+            if band.stop > band.start:
                 # Integrate power in the band
-                band_power = np.trapz(psd[freq_mask], frequencies[freq_mask])
-                band_powers[band_name] = band_power
+                # Welch runs in float32; hand back float64 powers
+                power = trapezoid(psd[..., band], frequencies[band], axis=-1)
+                band_powers[band_name] = power.astype(np.float64) if psd.ndim > 1 else float(power)
             else:
-                band_powers[band_name] = 0.0
+                band_powers[band_name] = np.zeros(psd.shape[:-1]) if psd.ndim > 1 else 0.0
                 
         return band_powers
     
+    def _locate_bands(self, frequencies: np.ndarray) -> Dict[str, slice]:
+        """Find the contiguous slice of a sorted frequency grid inside each band."""
+        return {
+            band_name: slice(np.searchsorted(frequencies, low_freq),
+                             np.searchsorted(frequencies, high_freq, side='right'))
+            for band_name, (low_freq, high_freq) in self.frequency_bands.items()
+        }
+    
     def analyze_all_channels(self) -> Dict[str, Dict]:
         """
         Perform comprehensive analysis on all EEG channels.
@@ -152,63 +327,133 @@ class EEGAnalyzer:
             Dictionary with analysis results for each channel
         """
         results = {}
-        
-        for channel in self.channels:
-            if channel in self.eeg_data.columns:
-                print(f"Analyzing channel: {channel}")
-                
-                # Get raw data
-                raw_data = self.eeg_data[channel]
-                
-                # Preprocess
-                filtered_data = self.preprocess_signal(raw_data)
-                
-                # Basic statistics
-                stats_results = {
-                    'mean': raw_data.mean(),
-                    'std': raw_data.std(),
-                    'min': raw_data.min(),
-                    'max': raw_data.max(),
-                    'skewness': stats.skew(raw_data.dropna()),
-                    'kurtosis': stats.kurtosis(raw_data.dropna())
-                }
-                
-                # Frequency analysis
-                band_powers = self.extract_band_power(filtered_data)
-                
-                # Signal quality metrics
-                quality_metrics = self._assess_signal_quality(raw_data)
+        if not self.channels:
+            return results
+            
+        # Spectra are computed per channel over its own valid samples.
+        # Channels missing the same samples (normally all of them, as Cortex
+        # sends whole rows) are filtered and transformed in one batch
+        n_channels = len(self.channels)
+        filtered_series = [None] * n_channels
+        spectra = [None] * n_channels
+        band_matrix = {band: np.full(n_channels, np.nan) for band in self.frequency_bands}
+        for rows, valid in self._group_by_valid_samples(self._eeg_matrix):
+            index = self.eeg_data.index if valid.all() else self.eeg_data.index[valid]
+            matrix = self._eeg_matrix[rows] if valid.all() else self._eeg_matrix[np.ix_(rows, valid)]
+            
+            # Preprocess and compute spectra for the group in one pass
+            if matrix.shape[1] >= 100 and self._filter_stages:
+                filtered = self._apply_filter(self._filter_stages, matrix, axis=1)
+            else:
+                filtered = matrix.astype(np.float64)
+            for row, i in enumerate(rows):
+                filtered_series[i] = pd.Series(filtered[row], index=index)
                 
-                results[channel] = {
-                    'statistics': stats_results,
-                    'band_powers': band_powers,
-                    'quality': quality_metrics,
-                    'filtered_data': filtered_data
-                }
+            # Welch needs at least one sample per segment of a quarter of
+            # the signal; band powers of shorter channels stay NaN
+            if matrix.shape[1] < 4:
+                continue
+            frequencies, psd = self._welch(filtered)
+            for band, powers in self._integrate_bands(frequencies, psd).items():
+                band_matrix[band][rows] = powers
+            for row, i in enumerate(rows):
+                spectra[i] = (frequencies, psd[row])
+        
+        # Basic statistics for all channels in one columnar pass; the
+        # quality metrics below reuse the same array's columns
+        raw = self.eeg_data[self.channels].to_numpy(dtype=np.float64)
+        with warnings.catch_warnings():
+            # An empty channel gets NaN statistics, as pandas gives it, without the warnings
+            warnings.simplefilter('ignore', RuntimeWarning)
+            means = np.nanmean(raw, axis=0)
+            stds = np.nanstd(raw, axis=0, ddof=1)
+            mins = np.nanmin(raw, axis=0)
+            maxs = np.nanmax(raw, axis=0)
+            skews = stats.skew(raw, axis=0, nan_policy='omit')
+            kurts = stats.kurtosis(raw, axis=0, nan_policy='omit')
+        
+        for i, channel in enumerate(self.channels):
+            print(f"Analyzing channel: {channel}")
+            
+            stats_results = {
+                'mean': means[i],
+                'std': stds[i],
+                'min': mins[i],
+                'max': maxs[i],
+                'skewness': skews[i],
+                'kurtosis': kurts[i]
+            }
+            
+            # Frequency analysis
+            band_powers = {band: float(powers[i]) for band, powers in band_matrix.items()}
+            
+            # Signal quality metrics
+            quality_metrics = self._assess_signal_quality(raw[:, i])
+            
+            filtered_data = filtered_series[i]
+            raw_key = self._cache_key(channel, self.eeg_data[channel], self._filter_settings)
+            self._filtered_cache[raw_key] = filtered_data.copy()
+            if spectra[i] is not None:
+                filtered_key = self._cache_key(channel, filtered_data, self._filter_settings)
+                self._psd_cache[filtered_key + (None,)] = self._freeze(spectra[i])
+                self._band_cache[filtered_key] = dict(band_powers)
+            
+            results[channel] = {
+                'statistics': stats_results,
+                'band_powers': band_powers,
+                'quality': quality_metrics,
+                'filtered_data': filtered_data
+            }
                 
         return results
     
-    def _assess_signal_quality(self, channel_data: pd.Series) -> Dict[str, float]:
+    @staticmethod
+    def _group_by_valid_samples(matrix: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Group the rows of a channels x samples matrix by where they are NaN.
+        
+        Args:
+            matrix: Channels x samples array
+            
+        Returns:
+            List of (row positions, valid sample mask) pairs, one per
+            distinct pattern of missing samples
+        """
+        valid = ~np.isnan(matrix)
+        if valid.all():
+            return [(np.arange(len(matrix)), valid[0])]
+            
+        groups = {}
+        for i, key in enumerate(np.packbits(valid, axis=1)):
+            groups.setdefault(key.tobytes(), []).append(i)
+        return [(np.array(rows), valid[rows[0]]) for rows in groups.values()]
+    
+    def _assess_signal_quality(self, channel_data: Union[pd.Series, np.ndarray]) -> Dict[str, float]:
         """Assess signal quality metrics."""
-        clean_data = channel_data.dropna()
+        clean_data = np.asarray(channel_data, dtype=np.float64)
+        clean_data = clean_data[~np.isnan(clean_data)]
+        n = clean_data.size
         
-        if len(clean_data) == 0:
+        if n == 0:
             return {'snr': 0, 'artifact_ratio': 1}
             
+        # One centered pass feeds both the signal power and the artifact threshold
+        centered = clean_data - clean_data.mean()
+        sum_sq = np.dot(centered, centered)
+        
         # Signal-to-noise ratio (simplified)
-        signal_power = np.var(clean_data)
+        signal_power = sum_sq / n
         # Use high-frequency content as noise estimate
-        if len(clean_data) > 100:
-            diff_signal = np.diff(clean_data)
-            noise_power = np.var(diff_signal)
+        if n > 100:
+            diff_signal = clean_data[1:] - clean_data[:-1]
+            noise_power = diff_signal.var()
             snr = 10 * np.log10(signal_power / noise_power) if noise_power > 0 else 0
         else:
             snr = 0
             
-        # Artifact detection (simple threshold-based)
-        threshold = 3 * clean_data.std()
-        artifacts = np.abs(clean_data - clean_data.mean()) > threshold
-        artifact_ratio = artifacts.sum() / len(clean_data)
+        # Artifact detection (simple threshold-based, sample standard deviation)
+        threshold = 3 * np.sqrt(sum_sq / (n - 1)) if n > 1 else np.inf
+        artifact_ratio = np.count_nonzero(np.abs(centered) > threshold) / n
         
         return {
             'snr': snr,
@@ -233,14 +478,14 @@ class EEGAnalyzer:
             
         # Get data
         raw_data = self.eeg_data[channel]
-        filtered_data = self.preprocess_signal(raw_data)
+        filtered_data = self.preprocess_signal(raw_data, channel=channel)
         
         # Limit to time window
         end_time = raw_data.index[-1]
         start_time = end_time - pd.Timedelta(seconds=time_window)
         
-        raw_windowed = raw_data[raw_data.index >= start_time]
-        filtered_windowed = filtered_data[filtered_data.index >= start_time]
+        raw_windowed = raw_data.loc[start_time:]
+        filtered_windowed = filtered_data.loc[start_time:]
         
         # Create subplots
         fig = make_subplots(
@@ -271,7 +516,7 @@ class EEGAnalyzer:
         )
         
         # Frequency domain
-        frequencies, psd = self.compute_psd(filtered_data)
+        frequencies, psd = self.compute_psd(filtered_data, channel=channel)
         fig.add_trace(
             go.Scatter(x=frequencies, y=10*np.log10(psd),
                       name='PSD', line=dict(color='green')),
@@ -279,7 +524,7 @@ class EEGAnalyzer:
         )
         
         # Band powers
-        band_powers = self.extract_band_power(filtered_data)
+        band_powers = self.extract_band_power(filtered_data, channel=channel)
         bands = list(band_powers.keys())
         powers = list(band_powers.values())
         
@@ -382,38 +627,44 @@ class EEGAnalyzer:
         # Generate report
         report_path = os.path.join(output_dir, "eeg_analysis_report.txt")
         
-        with open(report_path, 'w') as f:
-            f.write("EEG Signal Analysis Report\n")
-            f.write("=" * 50 + "\n\n")
+        # Collect the report lines first so the file is written in one call
+        lines = [
+            "EEG Signal Analysis Report\n",
+            "=" * 50 + "\n\n",
+            f"Dataset Information:\n",
+            f"- Number of channels: {len(self.channels)}\n",
+            f"- Sampling rate: {self.sampling_rate} Hz\n",
+            f"- Data shape: {self.eeg_data.shape}\n",
+            f"- Duration: {self.eeg_data.shape[0] / self.sampling_rate:.2f} seconds\n\n",
+        ]
+        
+        for channel, analysis in results.items():
+            stats = analysis['statistics']
+            lines.extend([
+                f"Channel: {channel}\n",
+                "-" * 20 + "\n",
+                f"Statistics:\n",
+                f"  Mean: {stats['mean']:.2f} µV\n",
+                f"  Std: {stats['std']:.2f} µV\n",
+                f"  Range: {stats['min']:.2f} to {stats['max']:.2f} µV\n",
+                f"  Skewness: {stats['skewness']:.3f}\n",
+                f"  Kurtosis: {stats['kurtosis']:.3f}\n\n",
+            ])
             
-            f.write(f"Dataset Information:\n")
-            f.write(f"- Number of channels: {len(self.channels)}\n")
-            f.write(f"- Sampling rate: {self.sampling_rate} Hz\n")
-            f.write(f"- Data shape: {self.eeg_data.shape}\n")
-            f.write(f"- Duration: {self.eeg_data.shape[0] / self.sampling_rate:.2f} seconds\n\n")
+            bands = analysis['band_powers']
+            lines.append(f"Frequency Band Powers:\n")
+            lines.extend(f"  {band.capitalize()}: {power:.2e} µV²/Hz\n" for band, power in bands.items())
+            lines.append("\n")
             
-            for channel, analysis in results.items():
-                f.write(f"Channel: {channel}\n")
-                f.write("-" * 20 + "\n")
-                
-                stats = analysis['statistics']
-                f.write(f"Statistics:\n")
-                f.write(f"  Mean: {stats['mean']:.2f} µV\n")
-                f.write(f"  Std: {stats['std']:.2f} µV\n")
-                f.write(f"  Range: {stats['min']:.2f} to {stats['max']:.2f} µV\n")
-                f.write(f"  Skewness: {stats['skewness']:.3f}\n")
-                f.write(f"  Kurtosis: {stats['kurtosis']:.3f}\n\n")
-                
-                bands = analysis['band_powers']
-                f.write(f"Frequency Band Powers:\n")
-                for band, power in bands.items():
-                    f.write(f"  {band.capitalize()}: {power:.2e} µV²/Hz\n")
-                f.write("\n")
-                
-                quality = analysis['quality']
-                f.write(f"Signal Quality:\n")
-                f.write(f"  SNR: {quality['snr']:.2f} dB\n")
-                f.write(f"  Artifact Ratio: {quality['artifact_ratio']:.3f}\n\n")
+            quality = analysis['quality']
+            lines.extend([
+                f"Signal Quality:\n",
+                f"  SNR: {quality['snr']:.2f} dB\n",
+                f"  Artifact Ratio: {quality['artifact_ratio']:.3f}\n\n",
+            ])
+            
+        with open(report_path, 'w') as f:
+            f.writelines(lines)
                 
         return report_path
 
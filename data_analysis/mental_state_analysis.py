@@ -15,7 +15,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from scipy import stats
 import os
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+from analysis_utils import lttb_indices, pairwise_correlation
 from data_loader import DataLoader
 
 
@@ -33,6 +34,23 @@ class MentalStateAnalyzer:
         self.mental_data = data_loader.loaded_data.get('met', pd.DataFrame())
         self.metrics = data_loader.get_mental_state_metrics()
         
+        # The numeric metric columns, resolved once so the analyses loop over
+        # them without testing membership in mental_data.columns each time
+        self._active_metrics = tuple(self.mental_data[self.metrics].select_dtypes(
+            include=[np.number]).columns)
+        
+        # Their values as one column-major array, so every analysis slices
+        # contiguous columns instead of re-selecting the DataFrame
+        self._arr = np.asfortranarray(
+            self.mental_data[list(self._active_metrics)].to_numpy(dtype=np.float64))
+        self._mask = ~np.isnan(self._arr)
+        self._valid_counts = self._mask.sum(axis=0)
+        self._positions = {metric: j for j, metric in enumerate(self._active_metrics)}
+        
+        # Results reused by the report and the plots
+        self._correlation_cache: Optional[pd.DataFrame] = None
+        self._transition_cache: Dict[Tuple[str, int], pd.DataFrame] = {}
+        
         # Define metric categories
         self.metric_categories = {
             'cognitive': ['attention', 'eng'],  # engagement
@@ -47,55 +65,75 @@ class MentalStateAnalyzer:
         Returns:
             Dictionary with statistics for each metric
         """
-        stats_results = {}
+        # Metrics without a single sample get no entry
+        has_data = self._valid_counts > 0
+        metrics = [metric for metric, keep in zip(self._active_metrics, has_data) if keep]
+        values = self._arr[:, has_data]
+        if not metrics:
+            return {}
+        
+        # One NaN-aware pass per statistic over every metric at once
+        means = np.nanmean(values, axis=0)
+        medians = np.nanmedian(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        mins = np.nanmin(values, axis=0)
+        maxs = np.nanmax(values, axis=0)
+        q25s, q75s = np.nanquantile(values, [0.25, 0.75], axis=0)
+        cvs = np.divide(stds, means, out=np.zeros_like(means), where=means != 0)
+        skews = stats.skew(values, axis=0, nan_policy='omit')
+        kurtoses = stats.kurtosis(values, axis=0, nan_policy='omit')
         
-        for metric in self.metrics:
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
-                
-                if len(data) > 0:
-                    stats_results[metric] = {
-                        'mean': data.mean(),
-                        'median': data.median(),
-                        'std': data.std(),
-                        'min': data.min(),
-                        'max': data.max(),
-                        'range': data.max() - data.min(),
-                        'cv': data.std() / data.mean() if data.mean() != 0 else 0,
-                        'skewness': stats.skew(data),
-                        'kurtosis': stats.kurtosis(data),
-                        'q25': data.quantile(0.25),
-                        'q75': data.quantile(0.75)
-                    }
+        stats_results = {}
+        for j, metric in enumerate(metrics):
+            stats_results[metric] = {
+                'mean': means[j],
+                'median': medians[j],
+                'std': stds[j],
+                'min': mins[j],
+                'max': maxs[j],
+                'range': maxs[j] - mins[j],
+                'cv': cvs[j],
+                'skewness': skews[j],
+                'kurtosis': kurtoses[j],
+                'q25': q25s[j],
+                'q75': q75s[j]
+            }
                     
         return stats_results
     
-    def analyze_temporal_patterns(self, window_size: str = '30S') -> Dict[str, pd.DataFrame]:
+    def analyze_temporal_patterns(self, window_size: Union[str, int] = '30s') -> Dict[str, pd.DataFrame]:
         """
         Analyze temporal patterns in mental state metrics.
         
         Args:
-            window_size: Window size for rolling statistics
+            window_size: Time span of the rolling window, e.g. '30s', or a
+                number of samples
             
         Returns:
             Dictionary with temporal analysis results
         """
         temporal_results = {}
         
-        for metric in self.metrics:
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
+        # Time spans are parsed once as a Timedelta; pandas no longer accepts
+        # upper-case unit aliases such as '30S' as rolling windows. Integers
+        # stay sample counts
+        window = pd.Timedelta(window_size) if isinstance(window_size, str) else window_size
+        
+        for j, metric in enumerate(self._active_metrics):
+            valid = self._mask[:, j]
+            
+            if self._valid_counts[j] > 0:
+                # One time-based Rolling object serves all four statistics
+                index = self.mental_data.index[valid]
+                rolling = pd.Series(self._arr[valid, j], index=index).rolling(window)
+                rolling_stats = pd.DataFrame({
+                    'mean': rolling.mean().to_numpy(),
+                    'std': rolling.std().to_numpy(),
+                    'min': rolling.min().to_numpy(),
+                    'max': rolling.max().to_numpy()
+                }, index=index)
                 
-                if len(data) > 0:
-                    # Rolling statistics
-                    rolling_stats = pd.DataFrame({
-                        'mean': data.rolling(window_size).mean(),
-                        'std': data.rolling(window_size).std(),
-                        'min': data.rolling(window_size).min(),
-                        'max': data.rolling(window_size).max()
-                    })
-                    
-                    temporal_results[metric] = rolling_stats
+                temporal_results[metric] = rolling_stats
                     
         return temporal_results
     
@@ -106,14 +144,13 @@ class MentalStateAnalyzer:
         Returns:
             Correlation matrix DataFrame
         """
-        # Select only numeric mental state columns
-        metric_data = self.mental_data[self.metrics]
-        
-        # Remove any non-numeric columns that might have slipped through
-        numeric_columns = metric_data.select_dtypes(include=[np.number]).columns
-        correlation_matrix = metric_data[numeric_columns].corr()
-        
-        return correlation_matrix
+        if self._correlation_cache is None:
+            # Non-numeric columns that might have slipped through were dropped in __init__
+            metrics = list(self._active_metrics)
+            self._correlation_cache = pd.DataFrame(
+                pairwise_correlation(self._arr, x_valid=self._mask), index=metrics, columns=metrics)
+            
+        return self._correlation_cache
     
     def detect_state_changes(self, threshold_std: float = 2.0) -> Dict[str, pd.DataFrame]:
         """
@@ -127,79 +164,131 @@ class MentalStateAnalyzer:
         """
         changes = {}
         
-        for metric in self.metrics:
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
+        for j, metric in enumerate(self._active_metrics):
+            valid = self._mask[:, j]
+            
+            if self._valid_counts[j] > 10:  # Need sufficient data
+                values = self._arr[valid, j]
+                rolling_mean, rolling_std = self._centered_rolling_stats(values, window=10)
                 
-                if len(data) > 10:  # Need sufficient data
-                    # Calculate rolling mean and std
-                    rolling_mean = data.rolling(window=10, center=True).mean()
-                    rolling_std = data.rolling(window=10, center=True).std()
-                    
-                    # Detect outliers
-                    z_scores = np.abs((data - rolling_mean) / rolling_std)
-                    significant_changes = z_scores > threshold_std
-                    
-                    change_points = data[significant_changes].reset_index()
-                    change_points['z_score'] = z_scores[significant_changes].values
-                    change_points['change_magnitude'] = np.abs(
-                        data[significant_changes] - rolling_mean[significant_changes]
-                    ).values
-                    
-                    changes[metric] = change_points
+                # Detect outliers
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    magnitudes = np.abs(values - rolling_mean)
+                    z_scores = magnitudes / rolling_std
+                significant = np.nonzero(z_scores > threshold_std)[0]
+                
+                times = self.mental_data.index[valid]
+                change_points = pd.DataFrame({
+                    times.name or 'index': times[significant],
+                    metric: values[significant],
+                    'z_score': z_scores[significant],
+                    'change_magnitude': magnitudes[significant]
+                })
+                
+                changes[metric] = change_points
                     
         return changes
     
-    def analyze_state_transitions(self, quantile_bins: int = 3) -> Dict[str, pd.DataFrame]:
+    def _centered_rolling_stats(self, values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Centered rolling mean and sample standard deviation.
+        
+        Matches Series.rolling(window, center=True) but sums the window's
+        shifted slices directly, so each window is summed exactly rather
+        than updated incrementally, which loses precision on flat stretches.
+        
+        Args:
+            values: 1-D sample array without NaNs
+            window: Window length in samples
+            
+        Returns:
+            Tuple of (rolling mean, rolling std), NaN where the window does not fit
+        """
+        n_windows = len(values) - window + 1
+        rolling_mean = np.full(len(values), np.nan)
+        rolling_std = np.full(len(values), np.nan)
+        if n_windows < 1:
+            return rolling_mean, rolling_std
+            
+        total = values[:n_windows].copy()
+        for offset in range(1, window):
+            total += values[offset:offset + n_windows]
+        means = total / window
+        
+        squares = np.square(values[:n_windows] - means)
+        for offset in range(1, window):
+            squares += np.square(values[offset:offset + n_windows] - means)
+            
+        centered = slice(window // 2, window // 2 + n_windows)
+        rolling_mean[centered] = means
+        rolling_std[centered] = np.sqrt(squares / (window - 1))
+        return rolling_mean, rolling_std
+    
+    def analyze_state_transitions(self, quantile_bins: int = 3,
+                                  metrics: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
         """
         Analyze transitions between different mental state levels.
         
         Args:
             quantile_bins: Number of quantile bins to create (low, medium, high states)
+            metrics: Metrics to analyze (default: all)
             
         Returns:
             Dictionary with transition matrices for each metric
         """
         transitions = {}
         
-        for metric in self.metrics:
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
+        states = pd.Index(['Low', 'Medium', 'High'])
+        if quantile_bins != len(states):
+            raise ValueError("Bin labels must be one fewer than the number of bin edges")
+        n_states = len(states)
+        inner_quantiles = np.linspace(0, 1, n_states + 1)[1:-1]
+        
+        requested = None if metrics is None else set(metrics)
+        
+        for j, metric in enumerate(self._active_metrics):
+            if requested is not None and metric not in requested:
+                continue
                 
-                if len(data) > 0:
-                    # Create quantile bins
-                    data_binned = pd.qcut(data, q=quantile_bins, 
-                                        labels=[f'Low', f'Medium', f'High'])
-                    
-                    # Create transition matrix
-                    transition_matrix = pd.DataFrame(
-                        index=data_binned.cat.categories,
-                        columns=data_binned.cat.categories,
-                        dtype=float
-                    ).fillna(0)
-                    
-                    # Count transitions
-                    for i in range(len(data_binned) - 1):
-                        current_state = data_binned.iloc[i]
-                        next_state = data_binned.iloc[i + 1]
-                        
-                        if pd.notna(current_state) and pd.notna(next_state):
-                            transition_matrix.loc[current_state, next_state] += 1
-                    
-                    # Normalize to get probabilities
-                    row_sums = transition_matrix.sum(axis=1)
-                    transition_matrix = transition_matrix.div(row_sums, axis=0).fillna(0)
-                    
-                    transitions[metric] = transition_matrix
+            # Cached matrices stay private; callers get their own copies
+            key = (metric, quantile_bins)
+            if key in self._transition_cache:
+                transitions[metric] = self._transition_cache[key].copy()
+                continue
+                
+            valid = self._mask[:, j]
+            
+            if self._valid_counts[j] > 0:
+                values = self._arr[valid, j]
+                
+                # Quantile bins, closed on the right like pd.qcut; tied edges
+                # leave a bin empty instead of failing
+                edges = np.quantile(values, inner_quantiles)
+                codes = np.searchsorted(edges, values, side='left')
+                
+                # Count transitions between consecutive samples' bins
+                counts = np.bincount(codes[:-1] * n_states + codes[1:],
+                                     minlength=n_states * n_states)
+                counts = counts.reshape(n_states, n_states).astype(float)
+                
+                # Normalize to get probabilities; rows never left stay zero
+                row_sums = counts.sum(axis=1, keepdims=True)
+                transition_matrix = pd.DataFrame(counts / np.maximum(row_sums, 1),
+                                                 index=states, columns=states)
+                
+                self._transition_cache[key] = transition_matrix
+                transitions[metric] = transition_matrix.copy()
                     
         return transitions
     
-    def create_timeline_plot(self, metrics_to_plot: List[str] = None) -> go.Figure:
+    def create_timeline_plot(self, metrics_to_plot: List[str] = None,
+                             max_points: int = 2000) -> go.Figure:
         """
         Create timeline plot of mental state metrics.
         
         Args:
             metrics_to_plot: List of metrics to plot (default: all)
+            max_points: Samples kept per trace after LTTB downsampling
             
         Returns:
             Plotly figure
@@ -212,13 +301,20 @@ class MentalStateAnalyzer:
         colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown']
         
         for i, metric in enumerate(metrics_to_plot):
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
+            if metric in self._positions:
+                j = self._positions[metric]
+                valid = self._mask[:, j]
                 
-                if len(data) > 0:
-                    fig.add_trace(go.Scatter(
-                        x=data.index,
-                        y=data.values,
+                if self._valid_counts[j] > 0:
+                    index = self.mental_data.index[valid]
+                    values = self._arr[valid, j]
+                    
+                    # Long sessions are reduced to the points that keep the
+                    # line's shape; WebGL draws them without per-point SVG
+                    keep = lttb_indices(index, values, max_points)
+                    fig.add_trace(go.Scattergl(
+                        x=index[keep],
+                        y=values[keep],
                         mode='lines',
                         name=metric.capitalize(),
                         line={'color': colors[i % len(colors)]}
@@ -236,6 +332,10 @@ class MentalStateAnalyzer:
     
     def create_correlation_heatmap(self) -> go.Figure:
         """Create correlation heatmap of mental state metrics."""
+        # Nothing to correlate without two metrics of at least two samples
+        if np.count_nonzero(self._valid_counts >= 2) < 2:
+            return go.Figure()
+            
         correlation_matrix = self.compute_correlations()
         
         if correlation_matrix.empty:
@@ -264,7 +364,7 @@ class MentalStateAnalyzer:
     def create_distribution_plots(self) -> go.Figure:
         """Create distribution plots for all metrics."""
         n_metrics = len(self.metrics)
-        if n_metrics == 0:
+        if n_metrics == 0 or not self._valid_counts.any():
             return go.Figure()
             
         # Calculate subplot layout
@@ -278,15 +378,16 @@ class MentalStateAnalyzer:
         )
         
         for i, metric in enumerate(self.metrics):
-            if metric in self.mental_data.columns:
-                data = self.mental_data[metric].dropna()
+            if metric in self._positions:
+                j = self._positions[metric]
+                valid = self._mask[:, j]
                 
-                if len(data) > 0:
+                if self._valid_counts[j] > 0:
                     row = i // cols + 1
                     col = i % cols + 1
                     
                     fig.add_trace(
-                        go.Histogram(x=data.values, name=metric, nbinsx=30),
+                        go.Histogram(x=self._arr[valid, j], name=metric, nbinsx=30),
                         row=row, col=col
                     )
         
@@ -308,12 +409,10 @@ class MentalStateAnalyzer:
         Returns:
             Plotly figure
         """
-        transitions = self.analyze_state_transitions()
-        
-        if metric not in transitions:
+        if metric not in self._positions or self._valid_counts[self._positions[metric]] == 0:
             return go.Figure()
             
-        transition_matrix = transitions[metric]
+        transition_matrix = self.analyze_state_transitions(metrics=[metric])[metric]
         
         fig = go.Figure(data=go.Heatmap(
             z=transition_matrix.values,
@@ -354,57 +453,59 @@ class MentalStateAnalyzer:
         
         report_path = os.path.join(output_dir, "mental_state_analysis_report.txt")
         
-        with open(report_path, 'w') as f:
-            f.write("Mental State Analysis Report\n")
-            f.write("=" * 50 + "\n\n")
-            
-            f.write("Dataset Overview:\n")
-            f.write(f"- Number of metrics: {len(self.metrics)}\n")
-            f.write(f"- Available metrics: {', '.join(self.metrics)}\n")
-            f.write(f"- Data duration: {len(self.mental_data)} samples\n\n")
+        # Collect the report lines first so the file is written in one call
+        lines = [
+            "Mental State Analysis Report\n",
+            "=" * 50 + "\n\n",
+            "Dataset Overview:\n",
+            f"- Number of metrics: {len(self.metrics)}\n",
+            f"- Available metrics: {', '.join(self.metrics)}\n",
+            f"- Data duration: {len(self.mental_data)} samples\n\n",
+        ]
+        
+        # Basic statistics
+        lines.extend(["Basic Statistics:\n", "-" * 20 + "\n"])
+        for metric, stats in basic_stats.items():
+            lines.extend([
+                f"\n{metric.capitalize()}:\n",
+                f"  Mean: {stats['mean']:.3f}\n",
+                f"  Median: {stats['median']:.3f}\n",
+                f"  Std Dev: {stats['std']:.3f}\n",
+                f"  Range: {stats['min']:.3f} - {stats['max']:.3f}\n",
+                f"  Coefficient of Variation: {stats['cv']:.3f}\n",
+            ])
+        
+        # Correlations
+        lines.extend(["\n\nStrongest Correlations:\n", "-" * 25 + "\n"])
+        if not correlations.empty:
+            # Find strongest correlations (excluding self-correlations)
+            first, second = np.triu_indices(len(correlations.columns), k=1)
+            pair_values = correlations.to_numpy()[first, second]
+            valid = ~np.isnan(pair_values)
+            first, second, pair_values = first[valid], second[valid], pair_values[valid]
             
-            # Basic statistics
-            f.write("Basic Statistics:\n")
-            f.write("-" * 20 + "\n")
-            for metric, stats in basic_stats.items():
-                f.write(f"\n{metric.capitalize()}:\n")
-                f.write(f"  Mean: {stats['mean']:.3f}\n")
-                f.write(f"  Median: {stats['median']:.3f}\n")
-                f.write(f"  Std Dev: {stats['std']:.3f}\n")
-                f.write(f"  Range: {stats['min']:.3f} - {stats['max']:.3f}\n")
-                f.write(f"  Coefficient of Variation: {stats['cv']:.3f}\n")
+            # Sort by absolute correlation value
+            top = np.argsort(-np.abs(pair_values), kind='stable')[:5]  # Top 5
             
-            # Correlations
-            f.write("\n\nStrongest Correlations:\n")
-            f.write("-" * 25 + "\n")
-            if not correlations.empty:
-                # Find strongest correlations (excluding self-correlations)
-                correlation_pairs = []
-                for i in range(len(correlations.columns)):
-                    for j in range(i+1, len(correlations.columns)):
-                        corr_value = correlations.iloc[i, j]
-                        if not np.isnan(corr_value):
-                            correlation_pairs.append((
-                                correlations.columns[i],
-                                correlations.columns[j],
-                                corr_value
-                            ))
+            lines.extend(
+                f"  {correlations.columns[first[k]]} - {correlations.columns[second[k]]}: "
+                f"{pair_values[k]:.3f}\n"
+                for k in top
+            )
+        
+        # State changes
+        lines.extend(["\n\nSignificant State Changes Detected:\n", "-" * 35 + "\n"])
+        for metric, changes in state_changes.items():
+            if len(changes) > 0:
+                magnitudes = changes['change_magnitude']
+                lines.extend([
+                    f"\n{metric.capitalize()}: {len(changes)} significant changes\n",
+                    f"  Largest change: {magnitudes.max():.3f}\n",
+                    f"  Average change: {magnitudes.mean():.3f}\n",
+                ])
                 
-                # Sort by absolute correlation value
-                correlation_pairs.sort(key=lambda x: abs(x[2]), reverse=True)
-                
-                for metric1, metric2, corr in correlation_pairs[:5]:  # Top 5
-                    f.write(f"  {metric1} - {metric2}: {corr:.3f}\n")
-            
-            # State changes
-            f.write("\n\nSignificant State Changes Detected:\n")
-            f.write("-" * 35 + "\n")
-            for metric, changes in state_changes.items():
-                if len(changes) > 0:
-                    f.write(f"\n{metric.capitalize()}: {len(changes)} significant changes\n")
-                    if len(changes) > 0:
-                        f.write(f"  Largest change: {changes['change_magnitude'].max():.3f}\n")
-                        f.write(f"  Average change: {changes['change_magnitude'].mean():.3f}\n")
+        with open(report_path, 'w') as f:
+            f.writelines(lines)
         
         return report_path
 
@@ -11,7 +11,8 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from scipy import signal
 import os
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+from analysis_utils import lttb_indices
 from data_loader import DataLoader
 
 
@@ -30,59 +31,103 @@ class MotionAnalyzer:
             'accelerometer': ['ACCX', 'ACCY', 'ACCZ'],
             'magnetometer': ['MAGX', 'MAGY', 'MAGZ']
         }
+        
+        # The motion data does not change after loading, so the derived
+        # signals every analysis and plot starts from are computed once
+        self._angles_cache: Optional[pd.DataFrame] = None
+        self._acc_magnitude_cache: Optional[pd.Series] = None
     
     def calculate_head_orientation(self) -> pd.DataFrame:
-        """Calculate head orientation from quaternions."""
+        """
+        Calculate head orientation from quaternions.
+        
+        The angles are computed once for every analysis and plot; each
+        caller gets its own copy.
+        """
+        if self._angles_cache is not None:
+            return self._angles_cache.copy()
+            
         if not all(q in self.motion_data.columns for q in self.sensor_groups['quaternion']):
             return pd.DataFrame()
             
         q_data = self.motion_data[self.sensor_groups['quaternion']]
+        q0, q1, q2, q3 = q_data.to_numpy(dtype=np.float64).T
         
-        # Calculate Euler angles from quaternions
-        angles = pd.DataFrame(index=q_data.index)
+        # Calculate Euler angles from quaternions, for all samples at once
+        # Roll (x-axis rotation)
+        sinr_cosp = 2 * (q0 * q1 + q2 * q3)
+        cosr_cosp = 1 - 2 * (q1 * q1 + q2 * q2)
+        roll = np.arctan2(sinr_cosp, cosr_cosp)
         
-        for i, row in q_data.iterrows():
-            q0, q1, q2, q3 = row['Q0'], row['Q1'], row['Q2'], row['Q3']
-            
-            # Roll (x-axis rotation)
-            sinr_cosp = 2 * (q0 * q1 + q2 * q3)
-            cosr_cosp = 1 - 2 * (q1 * q1 + q2 * q2)
-            roll = np.arctan2(sinr_cosp, cosr_cosp)
-            
-            # Pitch (y-axis rotation)
-            sinp = 2 * (q0 * q2 - q3 * q1)
-            sinp = np.clip(sinp, -1, 1)  # Clamp to avoid numerical errors
-            pitch = np.arcsin(sinp)
-            
-            # Yaw (z-axis rotation)
-            siny_cosp = 2 * (q0 * q3 + q1 * q2)
-            cosy_cosp = 1 - 2 * (q2 * q2 + q3 * q3)
-            yaw = np.arctan2(siny_cosp, cosy_cosp)
-            
-            angles.loc[i, 'roll'] = np.degrees(roll)
-            angles.loc[i, 'pitch'] = np.degrees(pitch)
-            angles.loc[i, 'yaw'] = np.degrees(yaw)
-            
+        # Pitch (y-axis rotation)
+        sinp = 2 * (q0 * q2 - q3 * q1)
+        sinp = np.clip(sinp, -1, 1)  # Clamp to avoid numerical errors
+        pitch = np.arcsin(sinp)
+        
+        # Yaw (z-axis rotation)
+        siny_cosp = 2 * (q0 * q3 + q1 * q2)
+        cosy_cosp = 1 - 2 * (q2 * q2 + q3 * q3)
+        yaw = np.arctan2(siny_cosp, cosy_cosp)
+        
+        angles = pd.DataFrame({
+            'roll': np.degrees(roll),
+            'pitch': np.degrees(pitch),
+            'yaw': np.degrees(yaw)
+        }, index=q_data.index)
+        
+        self._angles_cache = angles.copy()
         return angles
     
     def calculate_acceleration_magnitude(self) -> pd.Series:
-        """Calculate total acceleration magnitude."""
+        """Calculate total acceleration magnitude, once; each caller gets its own copy."""
+        if self._acc_magnitude_cache is not None:
+            return self._acc_magnitude_cache.copy()
+            
         if not all(acc in self.motion_data.columns for acc in self.sensor_groups['accelerometer']):
             return pd.Series()
             
         acc_data = self.motion_data[self.sensor_groups['accelerometer']]
-        magnitude = np.sqrt(acc_data['ACCX']**2 + acc_data['ACCY']**2 + acc_data['ACCZ']**2)
+        magnitude = pd.Series(np.linalg.norm(acc_data.to_numpy(dtype=np.float64), axis=1),
+                              index=acc_data.index)
         
+        self._acc_magnitude_cache = magnitude.copy()
         return magnitude
     
+    def _quat_angular_delta(self) -> pd.Series:
+        """
+        Rotation angle between consecutive orientation samples.
+        
+        Uses the geodesic distance 2·acos(|q_t · q_t-1|) between unit
+        quaternions, which needs no Euler conversion, is immune to gimbal
+        lock and treats q and -q as the same orientation.
+        
+        Returns:
+            Series of angle changes in degrees, NaN for the first sample
+        """
+        if not all(q in self.motion_data.columns for q in self.sensor_groups['quaternion']):
+            return pd.Series(dtype=np.float64)
+            
+        q_data = self.motion_data[self.sensor_groups['quaternion']]
+        q = q_data.to_numpy(dtype=np.float64)
+        
+        delta = np.full(len(q), np.nan)
+        dots = np.abs(np.einsum('ij,ij->i', q[1:], q[:-1]))
+        delta[1:] = np.degrees(2 * np.arccos(np.clip(dots, 0, 1)))
+        
+        return pd.Series(delta, index=q_data.index, name='angular_delta')
+    
     def detect_head_movements(self, threshold_angle: float = 5.0, 
-                            threshold_acceleration: float = 0.1) -> Dict[str, pd.DataFrame]:
+                            threshold_acceleration: float = 0.1,
+                            per_axis: bool = True) -> Dict[str, pd.DataFrame]:
         """
         Detect significant head movements.
         
         Args:
             threshold_angle: Minimum angle change (degrees) to consider movement
             threshold_acceleration: Minimum acceleration change to consider movement
+            per_axis: Report roll, pitch and yaw movements separately. When False
+                a single 'orientation_movement' entry thresholds the total
+                rotation between samples, which skips the Euler conversion
             
         Returns:
             Dictionary with detected movements
@@ -90,7 +135,18 @@ class MotionAnalyzer:
         movements = {}
         
         # Orientation-based movement detection
-        angles = self.calculate_head_orientation()
+        if not per_axis:
+            angle_delta = self._quat_angular_delta()
+            if not angle_delta.empty:
+                significant_movements = (angle_delta > threshold_angle).to_numpy()
+                
+                movement_events = self.motion_data.loc[
+                    significant_movements, self.sensor_groups['quaternion']].copy()
+                movement_events['magnitude'] = angle_delta[significant_movements]
+                
+                movements['orientation_movement'] = movement_events
+                
+        angles = self.calculate_head_orientation() if per_axis else pd.DataFrame()
         if not angles.empty:
             for angle_type in ['roll', 'pitch', 'yaw']:
                 if angle_type in angles.columns:
@@ -119,26 +175,35 @@ class MotionAnalyzer:
             
         return movements
     
-    def analyze_head_stability(self, window_size: str = '10S') -> Dict[str, pd.DataFrame]:
+    def analyze_head_stability(self, window_size: Union[str, int] = '10s') -> Dict[str, pd.DataFrame]:
         """
         Analyze head stability over time.
         
         Args:
-            window_size: Window size for stability analysis
+            window_size: Time span of the rolling window, e.g. '10s', or a
+                number of samples
             
         Returns:
             Dictionary with stability metrics
         """
         stability_metrics = {}
         
+        # Time spans are parsed once as a Timedelta; pandas no longer accepts
+        # upper-case unit aliases such as '10S' as rolling windows. Integers
+        # stay sample counts
+        window = pd.Timedelta(window_size) if isinstance(window_size, str) else window_size
+        
         # Orientation stability
         angles = self.calculate_head_orientation()
         if not angles.empty:
             for angle_type in ['roll', 'pitch', 'yaw']:
                 if angle_type in angles.columns:
-                    rolling_std = angles[angle_type].rolling(window_size).std()
-                    rolling_range = (angles[angle_type].rolling(window_size).max() - 
-                                   angles[angle_type].rolling(window_size).min())
+                    # One Rolling object serves all three statistics; pandas
+                    # updates each incrementally, so the cost does not grow
+                    # with the window length
+                    rolling = angles[angle_type].rolling(window)
+                    rolling_std = rolling.std()
+                    rolling_range = rolling.max() - rolling.min()
                     
                     stability_df = pd.DataFrame({
                         'std_deviation': rolling_std,
@@ -151,7 +216,7 @@ class MotionAnalyzer:
         # Acceleration stability
         acc_magnitude = self.calculate_acceleration_magnitude()
         if not acc_magnitude.empty:
-            acc_std = acc_magnitude.rolling(window_size).std()
+            acc_std = acc_magnitude.rolling(window).std()
             acc_stability = pd.DataFrame({
                 'std_deviation': acc_std,
                 'stability_score': 1 / (1 + acc_std)
@@ -161,8 +226,16 @@ class MotionAnalyzer:
             
         return stability_metrics
     
-    def create_motion_timeline(self) -> go.Figure:
-        """Create timeline visualization of motion data."""
+    def create_motion_timeline(self, max_points: int = 5000) -> go.Figure:
+        """
+        Create timeline visualization of motion data.
+        
+        Args:
+            max_points: Samples kept per trace after LTTB downsampling
+            
+        Returns:
+            Plotly figure
+        """
         if self.motion_data.empty:
             return go.Figure()
             
@@ -178,8 +251,7 @@ class MotionAnalyzer:
             for angle_type in ['roll', 'pitch', 'yaw']:
                 if angle_type in angles.columns:
                     fig.add_trace(
-                        go.Scatter(x=angles.index, y=angles[angle_type],
-                                 name=angle_type.capitalize(), mode='lines'),
+                        self._timeline_trace(angles[angle_type], angle_type.capitalize(), max_points),
                         row=1, col=1
                     )
         
@@ -187,8 +259,7 @@ class MotionAnalyzer:
         if all(acc in self.motion_data.columns for acc in self.sensor_groups['accelerometer']):
             for acc_axis in ['ACCX', 'ACCY', 'ACCZ']:
                 fig.add_trace(
-                    go.Scatter(x=self.motion_data.index, y=self.motion_data[acc_axis],
-                             name=acc_axis, mode='lines'),
+                    self._timeline_trace(self.motion_data[acc_axis], acc_axis, max_points),
                     row=2, col=1
                 )
         
@@ -196,8 +267,7 @@ class MotionAnalyzer:
         if all(mag in self.motion_data.columns for mag in self.sensor_groups['magnetometer']):
             for mag_axis in ['MAGX', 'MAGY', 'MAGZ']:
                 fig.add_trace(
-                    go.Scatter(x=self.motion_data.index, y=self.motion_data[mag_axis],
-                             name=mag_axis, mode='lines'),
+                    self._timeline_trace(self.motion_data[mag_axis], mag_axis, max_points),
                     row=3, col=1
                 )
         
@@ -209,15 +279,43 @@ class MotionAnalyzer:
         
         return fig
     
-    def create_3d_orientation_plot(self, sample_rate: int = 10) -> go.Figure:
-        """Create 3D visualization of head orientation."""
+    def _timeline_trace(self, series: pd.Series, name: str, max_points: int) -> go.Scatter:
+        """Line trace of a sensor series, reduced with LTTB to the points that keep its peaks."""
+        values = series.to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        index = series.index if valid.all() else series.index[valid]
+        values = values if valid.all() else values[valid]
+        
+        # Plotly serializes every point into the HTML, far more than a
+        # screen can show for a long recording
+        keep = lttb_indices(index, values, max_points)
+        return go.Scatter(x=index[keep], y=values[keep], name=name, mode='lines')
+    
+    def create_3d_orientation_plot(self, sample_rate: int = 10,
+                                   max_points: int = 5000) -> go.Figure:
+        """
+        Create 3D visualization of head orientation.
+        
+        Args:
+            sample_rate: Keep about one in sample_rate samples
+            max_points: Upper bound on plotted samples for long recordings
+            
+        Returns:
+            Plotly figure
+        """
         angles = self.calculate_head_orientation()
         
         if angles.empty:
             return go.Figure()
             
-        # Sample data to avoid overcrowding
-        sampled_angles = angles.iloc[::sample_rate]
+        # Sample data to avoid overcrowding. Each angle keeps an equal share
+        # of LTTB-selected samples, so the turns of every axis survive
+        n_out = min(max_points, -(-len(angles) // sample_rate)) // 3
+        keep = np.unique(np.concatenate([
+            lttb_indices(angles.index, angles[angle_type].to_numpy(), n_out)
+            for angle_type in ['roll', 'pitch', 'yaw']
+        ]))
+        sampled_angles = angles.iloc[keep]
         
         fig = go.Figure(data=go.Scatter3d(
             x=sampled_angles['roll'],
@@ -226,7 +324,7 @@ class MotionAnalyzer:
             mode='markers+lines',
             marker={
                 'size': 3,
-                'color': range(len(sampled_angles)),
+                'color': keep,
                 'colorscale': 'Viridis',
                 'showscale': True,
                 'colorbar': {'title': 'Time Progress'}
@@ -290,59 +388,68 @@ class MotionAnalyzer:
         
         # Perform analyses
         angles = self.calculate_head_orientation()
-        movements = self.detect_head_movements()
+        # The report counts events rather than breaking them down per axis,
+        # so it uses the geodesic angle, which is free of gimbal lock
+        movements = self.detect_head_movements(per_axis=False)
         stability = self.analyze_head_stability()
         
         report_path = os.path.join(output_dir, "motion_analysis_report.txt")
         
-        with open(report_path, 'w') as f:
-            f.write("Motion Analysis Report\n")
-            f.write("=" * 30 + "\n\n")
-            
-            f.write("Dataset Overview:\n")
-            f.write(f"- Motion data shape: {self.motion_data.shape}\n")
-            f.write(f"- Available sensors: {', '.join(self.sensors)}\n")
-            f.write(f"- Data duration: {len(self.motion_data)} samples\n\n")
-            
-            # Head orientation analysis
-            if not angles.empty:
-                f.write("Head Orientation Analysis:\n")
-                f.write("-" * 30 + "\n")
-                for angle_type in ['roll', 'pitch', 'yaw']:
-                    if angle_type in angles.columns:
-                        angle_data = angles[angle_type].dropna()
-                        f.write(f"\n{angle_type.capitalize()}:\n")
-                        f.write(f"  Mean: {angle_data.mean():.2f}°\n")
-                        f.write(f"  Std: {angle_data.std():.2f}°\n")
-                        f.write(f"  Range: {angle_data.min():.2f}° to {angle_data.max():.2f}°\n")
-            
-            # Movement detection
-            f.write("\n\nMovement Detection:\n")
-            f.write("-" * 20 + "\n")
-            total_movements = 0
-            for movement_type, movement_data in movements.items():
-                count = len(movement_data)
-                total_movements += count
-                f.write(f"{movement_type.replace('_', ' ').title()}: {count} events\n")
-                
-                if count > 0 and 'magnitude' in movement_data.columns:
-                    f.write(f"  Average magnitude: {movement_data['magnitude'].mean():.2f}\n")
-                    f.write(f"  Max magnitude: {movement_data['magnitude'].max():.2f}\n")
-            
-            f.write(f"\nTotal movement events: {total_movements}\n")
+        # Collect the report lines first so the file is written in one call
+        lines = [
+            "Motion Analysis Report\n",
+            "=" * 30 + "\n\n",
+            "Dataset Overview:\n",
+            f"- Motion data shape: {self.motion_data.shape}\n",
+            f"- Available sensors: {', '.join(self.sensors)}\n",
+            f"- Data duration: {len(self.motion_data)} samples\n\n",
+        ]
+        
+        # Head orientation analysis
+        if not angles.empty:
+            lines.extend(["Head Orientation Analysis:\n", "-" * 30 + "\n"])
+            for angle_type in ['roll', 'pitch', 'yaw']:
+                if angle_type in angles.columns:
+                    angle_data = angles[angle_type].dropna()
+                    lines.extend([
+                        f"\n{angle_type.capitalize()}:\n",
+                        f"  Mean: {angle_data.mean():.2f}°\n",
+                        f"  Std: {angle_data.std():.2f}°\n",
+                        f"  Range: {angle_data.min():.2f}° to {angle_data.max():.2f}°\n",
+                    ])
+        
+        # Movement detection
+        lines.extend(["\n\nMovement Detection:\n", "-" * 20 + "\n"])
+        total_movements = 0
+        for movement_type, movement_data in movements.items():
+            count = len(movement_data)
+            total_movements += count
+            lines.append(f"{movement_type.replace('_', ' ').title()}: {count} events\n")
             
-            # Stability analysis
-            if stability:
-                f.write("\n\nStability Analysis:\n")
-                f.write("-" * 20 + "\n")
-                for stability_type, stability_data in stability.items():
-                    if 'stability_score' in stability_data.columns:
-                        scores = stability_data['stability_score'].dropna()
-                        if len(scores) > 0:
-                            f.write(f"{stability_type.replace('_', ' ').title()}:\n")
-                            f.write(f"  Average stability: {scores.mean():.3f}\n")
-                            f.write(f"  Min stability: {scores.min():.3f}\n")
-                            f.write(f"  Max stability: {scores.max():.3f}\n\n")
+            if count > 0 and 'magnitude' in movement_data.columns:
+                lines.extend([
+                    f"  Average magnitude: {movement_data['magnitude'].mean():.2f}\n",
+                    f"  Max magnitude: {movement_data['magnitude'].max():.2f}\n",
+                ])
+        
+        lines.append(f"\nTotal movement events: {total_movements}\n")
+        
+        # Stability analysis
+        if stability:
+            lines.extend(["\n\nStability Analysis:\n", "-" * 20 + "\n"])
+            for stability_type, stability_data in stability.items():
+                if 'stability_score' in stability_data.columns:
+                    scores = stability_data['stability_score'].dropna()
+                    if len(scores) > 0:
+                        lines.extend([
+                            f"{stability_type.replace('_', ' ').title()}:\n",
+                            f"  Average stability: {scores.mean():.3f}\n",
+                            f"  Min stability: {scores.min():.3f}\n",
+                            f"  Max stability: {scores.max():.3f}\n\n",
+                        ])
+                        
+        with open(report_path, 'w') as f:
+            f.writelines(lines)
         
         return report_path
 
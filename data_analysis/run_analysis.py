@@ -28,6 +28,8 @@ def main():
     
     # Determine data directory
     data_dir = "../collected_data"
+    # --parallel writes the per-analyzer reports in worker processes
+    parallel = '--parallel' in sys.argv[1:]
     
     if not os.path.exists(data_dir):
         print(f"Data directory '{data_dir}' not found!")
@@ -51,7 +53,7 @@ def main():
         analyzer = ComprehensiveAnalyzer(data_dir)
         
         # Run analysis
-        output_files = analyzer.run_full_analysis()
+        output_files = analyzer.run_full_analysis(parallel=parallel)
         
         print("\n" + "=" * 40)
         print("Analysis Complete!")
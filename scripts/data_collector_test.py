@@ -19,6 +19,7 @@ import sys
 import time
 import json
 import csv
+import logging
 import os
 from datetime import datetime
 from core.data_collector import DataCollector
@@ -30,6 +31,9 @@ def main():
     print("EMOTIV CORTEX DATA COLLECTION TEST")
     print("=" * 60)
 
+    # Show the collector's periodic progress lines
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
     # Load environment variables
     load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
     your_app_client_id = os.getenv('CLIENT_ID')
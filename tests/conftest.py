@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The analysis modules import each other as top-level modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'data_analysis'))
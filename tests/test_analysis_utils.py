@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_utils import pairwise_correlation
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(500, 1))
+    x = pd.DataFrame(base + rng.normal(scale=[0.5, 1.0, 2.0], size=(500, 3)), columns=list('abc'))
+    y = pd.DataFrame(rng.normal(size=(500, 2)) - base, columns=list('de'))
+    y.iloc[:40, 0] = np.nan
+    return x, y
+
+
+def test_correlation_matrix_matches_dataframe_corr(frames):
+    x, _ = frames
+    
+    np.testing.assert_allclose(pairwise_correlation(x.to_numpy()), x.corr().to_numpy(), atol=1e-12)
+
+
+def test_correlation_matrix_with_missing_values_matches_dataframe_corr(frames):
+    x, _ = frames
+    x = x.copy()
+    x.iloc[::7, 1] = np.nan
+    x.iloc[100:160, 2] = np.nan
+    
+    np.testing.assert_allclose(pairwise_correlation(x.to_numpy()), x.corr().to_numpy(), atol=1e-12)
+
+
+def test_cross_correlation_matches_series_corr(frames):
+    x, y = frames
+    
+    corr = pairwise_correlation(x.to_numpy(), y.to_numpy())
+    
+    expected = [[x[i].corr(y[j]) for j in y] for i in x]
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+
+def test_constant_and_short_columns_are_nan():
+    x = np.array([[1.0, 5.0, np.nan], [2.0, 5.0, np.nan], [3.0, 5.0, 1.0]])
+    
+    corr = pairwise_correlation(x)
+    
+    assert corr[0, 0] == pytest.approx(1.0)
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 1])
+    assert np.isnan(corr[0, 2]) and np.isnan(corr[2, 2])
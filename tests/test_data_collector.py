@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from core import data_collector
+from core.data_collector import _write_chunks
+
+
+def read_back(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def fd(tmp_path):
+    path = tmp_path / 'stream.csv'
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    yield fd, path
+    os.close(fd)
+
+
+def test_write_chunks_writes_every_chunk_in_order(fd):
+    fd, path = fd
+    chunks = [f'{i},{i * 0.5}\n'.encode() for i in range(1500)]
+    
+    _write_chunks(fd, chunks)
+    
+    assert read_back(path) == b''.join(chunks)
+
+
+@pytest.mark.parametrize('limit', [0, 1, 7, 12, 25])
+def test_write_chunks_finishes_short_writes(fd, monkeypatch, limit):
+    fd, path = fd
+    if not hasattr(os, 'writev'):
+        pytest.skip("gather writes are not available")
+    chunks = [b'header\n', b'1,2,3\n', b'', b'4,5,6\n', b'7,8,9\n']
+    
+    # The OS accepts only the first limit bytes of each gather write
+    def short_writev(fd, buffers):
+        return os.write(fd, b''.join(buffers)[:limit])
+    monkeypatch.setattr(data_collector.os, 'writev', short_writev)
+    
+    _write_chunks(fd, chunks)
+    
+    assert read_back(path) == b''.join(chunks)
+
+
+class RecordingStreamer:
+    def __init__(self):
+        self.blocks = []
+
+    def send_block(self, stream_name, times, values, headers):
+        self.blocks.append((stream_name, times.copy(), values.copy()))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    collector = data_collector.DataCollector('client-id', 'client-secret')
+    monkeypatch.setattr(collector.c, 'open', lambda: None)
+    return collector
+
+
+def start(collector, streams):
+    collector.start_collection(streams=streams, duration=1)
+    collector.on_new_data_labels(data={'streamName': 'eeg', 'labels': ['AF3', 'F7']})
+    collector.on_new_data_labels(data={'streamName': 'sys', 'labels': ['event']})
+
+
+def send_samples(collector, first, count):
+    for i in range(first, first + count):
+        collector.on_new_eeg_data(data={'time': 1700000000.0 + i, 'eeg': [i, -i]})
+    collector.on_new_fe_data(data={'time': 1700000000.0 + first, 'eyeAct': 'blink',
+                                   'uAct': 'neutral', 'uPow': 0.0, 'lAct': 'smile', 'lPow': 0.5})
+    collector.on_new_com_data(data={'time': 1700000000.0 + first, 'action': 'push', 'power': 0.7})
+    collector.on_new_sys_data(data=['MC_Started'])
+
+
+def buffered_rows(collector, stream_name):
+    return [row for times, rows in collector.data_buffer[stream_name] for row in rows]
+
+
+def test_events_are_buffered_while_streaming_without_saving(collector):
+    collector.save_to_file = False
+    start(collector, ['eeg', 'fac', 'com', 'sys'])
+    collector._streamer = RecordingStreamer()
+    
+    send_samples(collector, 0, 5)
+    collector._drain_buffers()
+    
+    assert [block[0] for block in collector._streamer.blocks] == ['eeg']
+    assert len(buffered_rows(collector, 'eeg')) == 5
+    assert buffered_rows(collector, 'fac')[0][1] == 'blink'
+    assert buffered_rows(collector, 'com')[0][1:] == ['push', 0.7]
+    assert buffered_rows(collector, 'sys')[0][1] == 'MC_Started'
+
+
+def test_rings_do_not_leak_into_the_next_collection(collector):
+    collector.save_to_file = False
+    start(collector, ['eeg', 'fac', 'com', 'sys'])
+    send_samples(collector, 0, 5)  # never drained
+    
+    start(collector, ['eeg', 'fac', 'com', 'sys'])
+    send_samples(collector, 100, 3)
+    collector._drain_buffers()
+    
+    eeg = buffered_rows(collector, 'eeg')
+    assert [row[0] for row in eeg] == [100, 101, 102]
+    assert len(buffered_rows(collector, 'fac')) == 1
+    assert len(buffered_rows(collector, 'sys')) == 1
+    assert collector._sample_counts['eeg'] == 3
+
+
+def test_saved_csv_files_hold_headers_and_rows(collector):
+    start(collector, ['eeg', 'fac', 'sys'])
+    
+    send_samples(collector, 0, 3)
+    collector._drain_buffers()
+    send_samples(collector, 3, 2)
+    collector.save_data_to_files()
+    
+    files = {name.split('_')[1]: name for name in os.listdir('collected_data')}
+    eeg = read_back(os.path.join('collected_data', files['eeg'])).decode().splitlines()
+    assert eeg[0] == 'timestamp,AF3,F7'
+    assert eeg[1:] == [f'{1700000000 + i}.000000,{i},{-i}' for i in range(5)]
+    fac = read_back(os.path.join('collected_data', files['fac'])).decode().splitlines()
+    assert fac[0] == 'timestamp,eyeAct,uAct,uPow,lAct,lPow'
+    assert fac[1:] == ['1700000000.0,blink,neutral,0.0,smile,0.5',
+                       '1700000003.0,blink,neutral,0.0,smile,0.5']
+    sys_rows = read_back(os.path.join('collected_data', files['sys'])).decode().splitlines()
+    assert sys_rows[0] == 'timestamp,event'
+    assert [row.split(',')[1] for row in sys_rows[1:]] == ['MC_Started', 'MC_Started']
+
+
+def test_samples_without_labels_are_dropped_where_they_arrive(collector):
+    collector.save_to_file = False
+    collector.start_collection(streams=['eeg', 'sys'], duration=1)
+    
+    collector.on_new_eeg_data(data={'time': 1700000000.0, 'eeg': [0, 0]})
+    collector.on_new_sys_data(data=['MC_Started'])
+    collector.on_new_data_labels(data={'streamName': 'eeg', 'labels': ['AF3', 'F7']})
+    collector.on_new_eeg_data(data={'time': 1700000001.0, 'eeg': [1, -1]})
+    collector._drain_buffers()  # must not raise on the flusher thread
+    
+    assert [list(row) for row in buffered_rows(collector, 'eeg')] == [[1, -1]]
+    assert buffered_rows(collector, 'sys') == []
+
+
+class FailingStreamer(RecordingStreamer):
+    def send_block(self, stream_name, times, values, headers):
+        raise ConnectionResetError("recorder went away")
+
+
+def test_flush_interval_returns_to_normal_without_a_streamer(collector, monkeypatch):
+    collector.save_to_file = False
+    monkeypatch.setattr(data_collector, 'TcpSampleStreamer', lambda host, port: FailingStreamer())
+    collector.stream_to = ('localhost', 9000)
+    start(collector, ['eeg'])
+    collector._open_streamer()
+    assert collector._flush_interval == data_collector.STREAM_FLUSH_INTERVAL
+    
+    # A failed send drops the streamer for the rest of the run
+    send_samples(collector, 0, 3)
+    collector._drain_buffers()
+    assert collector._streamer is None
+    assert collector._flush_interval == data_collector.FLUSH_INTERVAL
+    
+    collector._open_streamer()
+    collector.stream_to = None
+    start(collector, ['eeg'])
+    assert collector._flush_interval == data_collector.FLUSH_INTERVAL
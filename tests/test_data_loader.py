@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader, feather
+
+
+def write_session(directory, data_type='mot', rows=50):
+    """Write a small collector-style CSV and return its path."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'timestamp': 1700000000.0 + np.arange(rows) / 64,
+        'Q0': rng.normal(size=rows),
+        'ACCX': rng.normal(size=rows),
+    })
+    path = os.path.join(directory, f'data_{data_type}_session.csv')
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_feather_cache_is_off_by_default(tmp_path):
+    path = write_session(tmp_path)
+    
+    DataLoader(str(tmp_path)).load_csv_file(path)
+    
+    assert not os.path.exists(path + '.feather')
+
+
+@pytest.mark.skipif(feather is None, reason="pyarrow is not installed")
+def test_feather_cache_round_trip(tmp_path):
+    path = write_session(tmp_path)
+    loader = DataLoader(str(tmp_path), feather_cache=True)
+    
+    parsed = loader.load_csv_file(path)
+    cached = loader.load_csv_file(path)
+    
+    assert os.path.exists(path + '.feather')
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    pd.testing.assert_frame_equal(cached, parsed)
+
+
+@pytest.mark.skipif(feather is None, reason="pyarrow is not installed")
+def test_corrupt_feather_cache_falls_back_to_csv(tmp_path):
+    path = write_session(tmp_path)
+    loader = DataLoader(str(tmp_path), feather_cache=True)
+    expected = loader.load_csv_file(path)
+    
+    # Truncated cache that is still newer than the CSV
+    cache_path = path + '.feather'
+    with open(cache_path, 'r+b') as f:
+        f.truncate(16)
+    os.utime(cache_path, (os.path.getmtime(path) + 10,) * 2)
+    
+    pd.testing.assert_frame_equal(loader.load_csv_file(path), expected)
+    # The broken cache was replaced by a readable one
+    pd.testing.assert_frame_equal(feather.read_feather(cache_path), expected)
+
+
+def test_timestamp_index_matches_to_datetime(tmp_path):
+    # Fractional epoch seconds at the collector's sampling rates, where a
+    # hand-rolled nanosecond conversion rounds differently from pandas
+    rows = 4000
+    path = write_session(tmp_path, rows=rows)
+    raw = pd.read_csv(path)
+    raw['timestamp'] = 1700000000.0 + np.random.default_rng(1).random(rows) * 1000
+    raw.to_csv(path, index=False)
+    
+    loader = DataLoader(str(tmp_path))
+    df = loader.load_csv_file(path)
+    
+    # The loader's previous construction, on the same parsed values
+    expected = loader._read_csv(path)
+    expected['timestamp'] = pd.to_datetime(expected['timestamp'], unit='s')
+    expected = expected.set_index('timestamp')
+    pd.testing.assert_index_equal(df.index, expected.index)
+    pd.testing.assert_frame_equal(df, expected)
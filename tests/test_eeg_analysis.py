@@ -0,0 +1,152 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import signal
+from scipy.integrate import trapezoid
+
+from data_loader import DataLoader
+from eeg_analysis import EEGAnalyzer
+
+CHANNELS = ['AF3', 'F7', 'F3', 'FC5']
+SAMPLING_RATE = 128
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    # One minute of EEG-like data: a large DC offset, slow drift, alpha and
+    # delta rhythms, 60 Hz mains and noise
+    rng = np.random.default_rng(0)
+    t = np.arange(60 * SAMPLING_RATE) / SAMPLING_RATE
+    df = pd.DataFrame({'timestamp': 1700000000.0 + t, 'COUNTER': np.arange(len(t)) % 128})
+    for i, channel in enumerate(CHANNELS):
+        df[channel] = (4200 + 40 * t / 60 + 20 * np.sin(2 * np.pi * 2 * t + i)
+                       + 10 * np.sin(2 * np.pi * 10 * t) + 3 * np.sin(2 * np.pi * 60 * t)
+                       + rng.normal(scale=5, size=len(t)))
+    df.to_csv(os.path.join(tmp_path, 'data_eeg_session.csv'), index=False)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader = DataLoader(str(tmp_path))
+        loader.load_all_data()
+        return EEGAnalyzer(loader)
+
+
+def baseline_filter(data, fs):
+    """The original preprocessing: each filter run separately with filtfilt."""
+    nyquist = fs / 2
+    for b, a in (signal.butter(4, 0.5 / nyquist, btype='high'),
+                 signal.butter(4, 50 / nyquist, btype='low'),
+                 signal.iirnotch(60, 30, fs)):
+        data = signal.filtfilt(b, a, data)
+    return data
+
+
+def baseline_band_powers(data, fs, bands):
+    window_length = min(len(data) // 4, int(2 * fs))
+    frequencies, psd = signal.welch(data, fs=fs, nperseg=window_length,
+                                    noverlap=window_length // 2)
+    powers = {}
+    for band, (low, high) in bands.items():
+        mask = (frequencies >= low) & (frequencies <= high)
+        powers[band] = trapezoid(psd[mask], frequencies[mask])
+    return powers
+
+
+def test_preprocess_signal_matches_separate_filtfilt(analyzer):
+    raw = analyzer.eeg_data['AF3']
+    
+    filtered = analyzer.preprocess_signal(raw)
+    
+    expected = baseline_filter(raw.to_numpy(dtype=np.float64), analyzer.sampling_rate)
+    np.testing.assert_allclose(filtered.to_numpy(), expected, rtol=0, atol=1e-3)
+
+
+def test_band_powers_match_baseline(analyzer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = analyzer.analyze_all_channels()
+    
+    for channel in CHANNELS:
+        raw = analyzer.eeg_data[channel].to_numpy(dtype=np.float64)
+        expected = baseline_band_powers(baseline_filter(raw, analyzer.sampling_rate),
+                                        analyzer.sampling_rate, analyzer.frequency_bands)
+        band_powers = results[channel]['band_powers']
+        
+        assert set(band_powers) == set(expected)
+        for band, power in band_powers.items():
+            assert type(power) is float
+            assert power == pytest.approx(expected[band], rel=1e-4)
+
+
+def test_single_channel_band_powers_match_batched(analyzer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        batched = analyzer.analyze_all_channels()['F7']['band_powers']
+    analyzer.clear_caches()
+    
+    single = analyzer.extract_band_power(analyzer.preprocess_signal(analyzer.eeg_data['F7']))
+    
+    for band, power in single.items():
+        assert type(power) is float
+        assert power == pytest.approx(batched[band], rel=1e-5)
+
+
+def test_memoized_results_follow_the_filter_settings(analyzer):
+    raw = analyzer.eeg_data['F3']
+    default = analyzer.extract_band_power(analyzer.preprocess_signal(raw, channel='F3'),
+                                          channel='F3')
+    
+    # The 2 Hz delta rhythm is filtered out above 4 Hz
+    filtered = analyzer.preprocess_signal(raw, highpass=4.0, channel='F3')
+    highpassed = analyzer.extract_band_power(filtered, channel='F3', highpass=4.0)
+    assert highpassed['delta'] < default['delta'] / 10
+    
+    # A slice of the channel is not served the whole recording's spectrum
+    _, psd = analyzer.compute_psd(filtered, channel='F3', highpass=4.0)
+    _, sliced = analyzer.compute_psd(filtered.iloc[:1000], channel='F3', highpass=4.0)
+    assert sliced.shape != psd.shape or not np.array_equal(sliced, psd)
+
+
+def test_memoized_results_are_not_shared_with_callers(analyzer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.analyze_all_channels()
+    filtered = analyzer.preprocess_signal(analyzer.eeg_data['F7'], channel='F7')
+    expected = analyzer.extract_band_power(filtered, channel='F7')
+    
+    filtered.iloc[:] = 0.0
+    analyzer.extract_band_power(filtered, channel='F7')['alpha'] = 0.0
+    _, psd = analyzer.compute_psd(filtered, channel='F7')
+    with pytest.raises(ValueError):
+        psd[:] = 0.0
+    
+    filtered = analyzer.preprocess_signal(analyzer.eeg_data['F7'], channel='F7')
+    assert filtered.abs().max() > 0
+    assert analyzer.extract_band_power(filtered, channel='F7') == expected
+
+
+def test_missing_samples_on_one_channel_leave_the_others_unchanged(analyzer, tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        clean = analyzer.analyze_all_channels()
+        
+        df = pd.read_csv(os.path.join(tmp_path, 'data_eeg_session.csv'))
+        df.loc[::3, 'F7'] = np.nan
+        df['FC5'] = np.nan
+        df.to_csv(os.path.join(tmp_path, 'data_eeg_session.csv'), index=False)
+        loader = DataLoader(str(tmp_path))
+        loader.load_all_data()
+        results = EEGAnalyzer(loader).analyze_all_channels()
+    
+    for channel in ['AF3', 'F3']:
+        for band, power in results[channel]['band_powers'].items():
+            assert power == pytest.approx(clean[channel]['band_powers'][band], rel=1e-5)
+    
+    # F7 falls back to its own valid samples, like a single-channel analysis
+    raw = analyzer.eeg_data['F7'].to_numpy(dtype=np.float64)
+    raw = np.delete(raw, np.s_[::3])
+    expected = baseline_band_powers(baseline_filter(raw, analyzer.sampling_rate),
+                                    analyzer.sampling_rate, analyzer.frequency_bands)
+    for band, power in results['F7']['band_powers'].items():
+        assert power == pytest.approx(expected[band], rel=1e-4)
+    
+    assert all(np.isnan(power) for power in results['FC5']['band_powers'].values())
@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader
+from mental_state_analysis import MentalStateAnalyzer
+
+METRICS = ['attention', 'eng', 'exc', 'str', 'rel']
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    # Ten minutes of performance metrics at 2 Hz
+    rng = np.random.default_rng(0)
+    n = 1200
+    df = pd.DataFrame({'timestamp': 1700000000.0 + np.arange(n) / 2})
+    for metric in METRICS:
+        df[f'{metric}.isActive'] = True
+        df[metric] = rng.random(n)
+    df.to_csv(os.path.join(tmp_path, 'data_met_session.csv'), index=False)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader = DataLoader(str(tmp_path))
+        loader.load_all_data()
+        return MentalStateAnalyzer(loader)
+
+
+def test_state_transitions_match_qcut(analyzer):
+    transitions = analyzer.analyze_state_transitions()
+    
+    for metric in METRICS:
+        states = pd.qcut(analyzer.mental_data[metric], q=3, labels=['Low', 'Medium', 'High'])
+        expected = pd.crosstab(states.iloc[:-1].to_numpy(), states.iloc[1:].to_numpy(),
+                               normalize='index')
+        expected = expected.reindex(index=['Low', 'Medium', 'High'],
+                                    columns=['Low', 'Medium', 'High'])
+        np.testing.assert_allclose(transitions[metric].to_numpy(), expected.to_numpy())
+
+
+def test_state_transitions_are_not_shared_with_the_cache(analyzer):
+    first = analyzer.analyze_state_transitions()
+    expected = first['attention'].copy()
+    first['attention'].iloc[:, :] = 0.0
+    
+    second = analyzer.analyze_state_transitions()
+    pd.testing.assert_frame_equal(second['attention'], expected)
@@ -0,0 +1,42 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import DataLoader
+from motion_analysis import MotionAnalyzer
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    # One minute of motion data at 64 Hz: a slow head turn about the z axis
+    rng = np.random.default_rng(0)
+    n = 3840
+    t = np.arange(n) / 64
+    half_angle = np.radians(30) * np.sin(2 * np.pi * t / 20) / 2
+    df = pd.DataFrame({'timestamp': 1700000000.0 + t,
+                       'Q0': np.cos(half_angle), 'Q1': 0.0, 'Q2': 0.0, 'Q3': np.sin(half_angle)})
+    for axis in ['ACCX', 'ACCY', 'ACCZ', 'MAGX', 'MAGY', 'MAGZ']:
+        df[axis] = rng.normal(size=n)
+    df.to_csv(os.path.join(tmp_path, 'data_mot_session.csv'), index=False)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader = DataLoader(str(tmp_path))
+        loader.load_all_data()
+        return MotionAnalyzer(loader)
+
+
+def test_cached_signals_are_not_shared_with_callers(analyzer):
+    angles = analyzer.calculate_head_orientation()
+    magnitude = analyzer.calculate_acceleration_magnitude()
+    expected_angles, expected_magnitude = angles.copy(), magnitude.copy()
+    
+    angles['yaw'] = 0.0
+    magnitude.iloc[:] = 0.0
+    
+    pd.testing.assert_frame_equal(analyzer.calculate_head_orientation(), expected_angles)
+    pd.testing.assert_series_equal(analyzer.calculate_acceleration_magnitude(), expected_magnitude)
+    assert analyzer.calculate_head_orientation()['yaw'].abs().max() == pytest.approx(30, abs=0.1)